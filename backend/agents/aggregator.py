@@ -3,7 +3,7 @@ import os
 import sys
 import uuid
 import requests
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 
 from pathlib import Path
 from dotenv import load_dotenv
@@ -146,7 +146,7 @@ def submit_query_and_return(session_id: str, context_metadata: List[Dict[str, st
 
 # ================= LANGGRAPH-CALLABLE WRAPPER =================
 
-def run_aggregator_agent(payload: Dict) -> str:
+def run_aggregator_agent(payload: Dict, check_cancelled: Optional[Callable[[], None]] = None) -> str:
     """
     payload schema (expected):
     {
@@ -174,6 +174,9 @@ def run_aggregator_agent(payload: Dict) -> str:
     ]
 
     session_id = create_chat_session(context_metadata)
+    if check_cancelled is not None:
+        # Don't send the query if the run was abandoned meanwhile
+        check_cancelled()
     return submit_query_and_return(session_id, context_metadata)
 
 # ================= STANDALONE EXECUTION =================
@@ -1,28 +1,130 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Header, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Dict, Optional
+from typing import Awaitable, Dict, Optional
 from contextlib import asynccontextmanager
-import io
+import os
+import re
 import json
-import base64
 import asyncio
+import threading
 
 from graph.graph import build_synapse_council_graph
-from audio_processor import transcribe_audio_async, get_cache_stats, clear_cache
+from graph.checkpoint import get_checkpointer, invoke_with_resume
+from decision_store import get_decision_store, close_decision_store, get_query_hash
+from idempotency import idempotency_store, fingerprint
+from realtime.connection import ClientConnection
+from realtime.session import IncrementalTranscription, transcript_similarity, SPECULATIVE_MIN_SIMILARITY
+from transcription.executor import TranscriptionOverloaded
+from transcription.buffers import AudioBuffer, AudioTooLarge, MAX_AUDIO_BYTES
 
 # Global graph instance
 graph = None
 
+# Decision-only workers (SYNAPSE_AUDIO_ENABLED=false) never import the audio
+# stack; otherwise it is imported on first use, not at startup.
+AUDIO_ENABLED = os.getenv("SYNAPSE_AUDIO_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+def get_audio_processor():
+    """Import audio_processor (whisper, torch) lazily; 503 on decision-only workers."""
+    if not AUDIO_ENABLED:
+        raise HTTPException(status_code=503, detail="Audio features are disabled on this worker")
+    import audio_processor
+    return audio_processor
+
+
+# Whisper model sizes accepted by the transcription endpoints; "auto" lets the
+# latency policy pick one per request (transcription/policy.py)
+MODEL_SIZE_PATTERN = r"^(auto|(tiny|base|small|medium|large(-v[123])?|turbo)(\.en)?)$"
+DEFAULT_MODEL_SIZE = os.getenv("SYNAPSE_MODEL_SIZE", "base")
+# Sizes clients may request: anything larger forces a multi-GB load and evicts warm models.
+# The default size is always allowed.
+ALLOWED_MODEL_SIZES = {
+    size.strip() for size in os.getenv("SYNAPSE_WHISPER_ALLOWED_SIZES", "auto,tiny,base,small").split(",") if size.strip()
+} | {DEFAULT_MODEL_SIZE}
+
+
+def allowed_model_size(model_size: str = Query(DEFAULT_MODEL_SIZE, pattern=MODEL_SIZE_PATTERN)) -> str:
+    """`model_size` query parameter, restricted to this deployment's allowed sizes (422 otherwise)."""
+    if model_size not in ALLOWED_MODEL_SIZES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"model_size '{model_size}' is not allowed here (allowed: {', '.join(sorted(ALLOWED_MODEL_SIZES))})"
+        )
+    return model_size
+
+# Whisper warmup state reported by /health ("disabled", "warming", "ready", "failed")
+audio_warmup = {"status": "disabled", "models": {}}
+
+
+async def warm_up_audio():
+    """Preload and warm the configured Whisper models off the event loop."""
+    try:
+        # Importing audio_processor loads whisper and torch, so it runs off the loop too
+        audio = await asyncio.to_thread(get_audio_processor)
+        audio_warmup["models"] = await asyncio.to_thread(audio.warmup_models, audio.PRELOAD_MODEL_SIZES)
+        audio_warmup["status"] = "ready"
+    except Exception as e:
+        print(f"[WARMUP ERROR] Whisper warmup failed: {e}")
+        audio_warmup["status"] = "failed"
+
+
+async def reject_if_audio_disabled(websocket: WebSocket) -> bool:
+    if AUDIO_ENABLED:
+        return False
+    await websocket.close(code=1013, reason="Audio features are disabled on this worker")
+    return True
+
+
+async def reject_oversized_audio(conn: ClientConnection, error: AudioTooLarge):
+    """Tell the client its session exceeded the audio cap and close with 1009 (message too big)."""
+    await conn.send_json({"type": "error", "code": "too_large", "message": str(error)})
+    await conn.close(code=1009, reason="Audio limit exceeded")
+
+
+# How often long-running HTTP requests check whether the client is still connected
+DISCONNECT_POLL_SECONDS = float(os.getenv("SYNAPSE_DISCONNECT_POLL_SECONDS", "0.5"))
+
+
+async def cancel_on_disconnect(request: Request, work: Awaitable):
+    """
+    Await `work`, cancelling it if the HTTP client disconnects first (499).
+    Executions shared through an Idempotency-Key are shielded by the store,
+    so they keep running for the retries that attach to them.
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                print(f"[CANCEL] Client disconnected from {request.url.path}, cancelling its work")
+                raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize graph at startup"""
+    """Initialize graph and decision history at startup, warm Whisper in the background"""
     global graph
-    graph = build_synapse_council_graph()
+    graph = build_synapse_council_graph(checkpointer=get_checkpointer())
+    get_decision_store().start()
+    warmup_task = None
+    if AUDIO_ENABLED and os.getenv("SYNAPSE_WHISPER_PRELOAD"):
+        # Set before the task first runs, so /health never reports ready in between
+        audio_warmup["status"] = "warming"
+        warmup_task = asyncio.create_task(warm_up_audio())
     yield
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
     # Cleanup if needed
     graph = None
+    close_decision_store()
 
 
 app = FastAPI(
@@ -32,6 +134,72 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Upload endpoints and the size of reads from their request bodies
+UPLOAD_PATHS = ("/transcribe", "/transcribe-and-decide", "/transcribe-stream")
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Multipart boundaries and form fields on top of the audio itself
+UPLOAD_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadSizeLimit:
+    """
+    Reject oversized uploads: by Content-Length before the multipart body is
+    read, and by counting body bytes as they arrive for requests without one
+    (chunked transfer), so nothing past the cap reaches the multipart parser.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not (scope["type"] == "http" and scope["method"] == "POST" and scope["path"] in UPLOAD_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        limit = MAX_AUDIO_BYTES + UPLOAD_OVERHEAD_BYTES
+        too_large = JSONResponse(
+            status_code=413,
+            content={"detail": f"File too large (max {MAX_AUDIO_BYTES / (1024 * 1024):g}MB)"}
+        )
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > limit:
+            await too_large(scope, receive, send)
+            return
+
+        received = 0
+        started = False
+        rejected = False
+
+        async def counting_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request" and not rejected:
+                received += len(message.get("body", b""))
+                if received > limit and not started:
+                    # Answer now and end the body for the app, which sees a disconnect
+                    rejected = True
+                    await too_large(scope, receive, send)
+            if rejected:
+                return {"type": "http.disconnect"}
+            return message
+
+        async def tracking_send(message):
+            nonlocal started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, tracking_send)
+        except Exception:
+            if not rejected:
+                raise
+
+
+app.add_middleware(UploadSizeLimit)
+
 # CORS configuration for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -42,6 +210,12 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(TranscriptionOverloaded)
+async def transcription_overloaded_handler(request, exc: TranscriptionOverloaded):
+    """Backpressure: tell clients to retry instead of queueing without bound."""
+    return JSONResponse(status_code=429, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
 # Pydantic Models
 class Weights(BaseModel):
     ethical: float = Field(..., ge=0.0, le=1.0)
@@ -74,6 +248,9 @@ class TranscriptionResponse(BaseModel):
     language: Optional[str] = "en"
     cached: bool = False
     error: Optional[str] = None
+    model: Optional[str] = None
+    # Decoding profile picked for model_size="auto"
+    profile: Optional[str] = None
 
 
 @app.get("/")
@@ -87,7 +264,19 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "graph_initialized": graph is not None}
+    """Readiness probe: 503 until the graph is built and configured Whisper models are warm, or if warmup failed."""
+    ready = graph is not None and audio_warmup["status"] in ("disabled", "ready")
+    if ready:
+        status = "healthy"
+    else:
+        status = "failed" if audio_warmup["status"] == "failed" else "starting"
+    body = {
+        "status": status,
+        "graph_initialized": graph is not None,
+        "audio_enabled": AUDIO_ENABLED,
+        "audio_warmup": audio_warmup,
+    }
+    return JSONResponse(status_code=200 if ready else 503, content=body)
 
 
 @app.websocket("/ws/transcribe-live")
@@ -98,108 +287,146 @@ async def websocket_transcribe(websocket: WebSocket):
     Live audio streaming without recording/uploading delays!
     
     Protocol:
-    1. Client sends base64-encoded audio chunks
-    2. Server transcribes each chunk and sends results back
-    3. Client can send "END" message to finalize transcription
+    1. Client sends audio as binary frames (8-byte header + payload, see
+       realtime/protocol.py); base64 JSON "audio" messages still work
+    2. Client sends JSON control messages: "config" (language, client_id),
+       "transcribe", "reset" (start a new utterance)
+    3. On "transcribe" the server transcribes only newly arrived audio over a
+       sliding window and sends a partial hypothesis: "committed" text is
+       stable, the "tentative" tail may still change
+    4. Server sends "utterance_end" when voice activity detection sees a
+       pause after speech (a good moment to request a transcription)
+    5. Client can send "END" message to get the final transcription
+    6. Frames are acked on arrival, even while a transcription runs; on
+       {"type": "backpressure", "paused": true} the client should hold its
+       audio until "paused": false
+    
+    With "language": null the language is detected until one detection is
+    confident, then reused for the session (and for the client's next
+    session when a "client_id" is configured).
     
     Example usage (frontend):
     ```javascript
     const ws = new WebSocket('ws://localhost:8000/ws/transcribe-live');
+    ws.binaryType = "arraybuffer";
     ws.onmessage = (event) => {
       const result = JSON.parse(event.data);
       console.log("Transcribed:", result.text);
     };
-    // Send audio chunk
-    ws.send(JSON.stringify({
-      type: "audio",
-      data: base64AudioChunk,
-      language: "en"
-    }));
+    ws.send(JSON.stringify({ type: "config", language: "en" }));
+    // Send audio chunk: version=1, codec=0 (container), sample rate, sequence number
+    const header = new DataView(new ArrayBuffer(8));
+    header.setUint8(0, 1); header.setUint8(1, 0);
+    header.setUint16(2, 16000); header.setUint32(4, seq++);
+    ws.send(new Blob([header.buffer, audioChunk]));
     ```
     """
+    if await reject_if_audio_disabled(websocket):
+        return
     await websocket.accept()
-    accumulated_audio = io.BytesIO()
+    # Frames are received, validated and acked by the connection's reader task
+    conn = ClientConnection(websocket)
+    conn.start()
+    transcriber = None
     language = "en"
+    client_id = None
     
     try:
         while True:
             try:
-                # Receive message from client
-                data = await websocket.receive_text()
-                message = json.loads(data)
+                # Next message from the client: binary audio frame or JSON control
+                frame, message = await conn.receive()
                 
-                if message.get("type") == "audio":
-                    # Accumulate audio data
-                    audio_data = base64.b64decode(message.get("data", ""))
-                    accumulated_audio.write(audio_data)
-                    language = message.get("language", "en")
+                if frame is not None:
+                    # Decode incrementally as audio arrives
+                    if message is not None:
+                        language = message.get("language", "en")
+                    if transcriber is None:
+                        transcriber = get_audio_processor().create_streaming_transcriber(
+                            language, audio_format=frame.audio_format, sample_rate=frame.sample_rate,
+                            client_id=client_id
+                        )
+                    transcriber.language = language
+                    transcriber.feed(frame.payload)
                     
-                    # Send acknowledgment
-                    await websocket.send_json({
-                        "type": "ack",
-                        "bytes_received": len(audio_data),
-                        "total_bytes": accumulated_audio.tell()
-                    })
+                    # VAD end-of-utterance: speech followed by a pause
+                    if transcriber.poll_utterance_end():
+                        await conn.send_json({"type": "utterance_end"})
+                
+                elif message.get("type") == "config":
+                    language = message.get("language", language)
+                    client_id = message.get("client_id", client_id)
+                    if transcriber is not None:
+                        transcriber.language = language
+                        transcriber.session_language.client_id = client_id
+                    await conn.send_json({"type": "config_updated", "language": language})
                 
                 elif message.get("type") == "transcribe":
-                    # Transcribe accumulated audio
-                    audio_bytes = accumulated_audio.getvalue()
-                    print(f"[WS-TRANSCRIBE] Received transcribe request with {len(audio_bytes)} bytes")
-                    if audio_bytes:
-                        try:
-                            result = await transcribe_audio_async(audio_bytes, language)
-                            print(f"[WS-TRANSCRIBE] Sending result: {result}")
-                            await websocket.send_json({
-                                "type": "transcription",
-                                "text": result.get("text", ""),
-                                "language": result.get("language", language),
-                                "cached": result.get("cached", False),
-                                "error": result.get("error")
-                            })
-                            # Reset for next stream
-                            accumulated_audio = io.BytesIO()
-                        except Exception as e:
-                            error_msg = f"Transcription error: {str(e)}"
-                            print(f"[WS-TRANSCRIBE-ERROR] {error_msg}")
-                            await websocket.send_json({
-                                "type": "error",
-                                "message": error_msg
-                            })
+                    # Transcribe only audio that arrived since the last committed words
+                    print(f"[WS-TRANSCRIBE] Received transcribe request with {conn.total_bytes} bytes")
+                    if transcriber is not None:
+                        result = await conn.guard(get_audio_processor().streaming_step_async(transcriber))
+                        await conn.send_json({
+                            "type": "transcription",
+                            "partial": True,
+                            "text": result.get("text", ""),
+                            "committed": result.get("committed", ""),
+                            "tentative": result.get("tentative", ""),
+                            "language": result.get("language") or language,
+                            "cached": False,
+                            "error": result.get("error")
+                        })
                     else:
-                        await websocket.send_json({
+                        await conn.send_json({
                             "type": "error",
                             "message": "No audio data accumulated"
                         })
                 
+                elif message.get("type") == "reset":
+                    # Start a new utterance (the reader already reset the frame sequence)
+                    if transcriber is not None:
+                        transcriber.close()
+                    transcriber = None
+                    await conn.send_json({"type": "reset"})
+                
                 elif message.get("type") == "END":
                     # Final transcription and close
-                    audio_bytes = accumulated_audio.getvalue()
-                    if audio_bytes:
-                        result = await transcribe_audio_async(audio_bytes, language)
-                        await websocket.send_json({
+                    if transcriber is not None:
+                        result = await conn.guard(get_audio_processor().streaming_step_async(transcriber, final=True))
+                        await conn.send_json({
                             "type": "transcription",
                             "text": result.get("text", ""),
-                            "language": result.get("language", language),
-                            "cached": result.get("cached", False),
+                            "committed": result.get("committed", ""),
+                            "tentative": "",
+                            "language": result.get("language") or language,
+                            "cached": False,
                             "final": True,
                             "error": result.get("error")
                         })
                     break
                     
-            except json.JSONDecodeError:
-                await websocket.send_json({
+            except TranscriptionOverloaded as e:
+                await conn.send_json({
                     "type": "error",
-                    "message": "Invalid JSON format"
+                    "code": "overloaded",
+                    "message": str(e)
                 })
+            except AudioTooLarge as e:
+                await reject_oversized_audio(conn, e)
+                break
                 
     except WebSocketDisconnect:
         print("Client disconnected from transcription WebSocket")
     except Exception as e:
-        await websocket.send_json({
+        await conn.send_json({
             "type": "error",
             "message": f"Error: {str(e)}"
         })
-        await websocket.close(code=1011, reason=str(e))
+        await conn.close(code=1011, reason=str(e))
+    finally:
+        if transcriber is not None:
+            transcriber.close()
+        await conn.shutdown()
 
 
 @app.websocket("/ws/transcribe-and-decide")
@@ -210,14 +437,34 @@ async def websocket_transcribe_and_decide(websocket: WebSocket):
     Combines transcription and decision-making in one streaming connection!
     
     Protocol:
-    1. Client sends audio chunks
-    2. Server transcribes and makes decision
-    3. Server streams agent outputs as they complete
-    4. Send "DECIDE" message to trigger decision analysis
+    1. Client sends audio chunks (binary frames, or legacy base64 JSON)
+    2. Server transcribes incrementally while audio arrives and sends partial
+       "transcription" messages, plus "utterance_end" on pauses
+    3. Send "DECIDE" message to trigger decision analysis: only the audio
+       after the last background step is left to transcribe
+    4. Server streams agent outputs as they complete
+    
+    With {"type": "config", "speculative": true}, the council starts on the
+    transcript as soon as the speaker pauses ("speculation_started"). At
+    DECIDE the speculative run is kept if the final transcript is nearly the
+    same (SYNAPSE_SPECULATIVE_SIMILARITY) and restarted otherwise; the
+    "speculation" message reports which.
+    
+    Frames are acked as they arrive; "backpressure" messages and language
+    detection reuse ("client_id" in config) work as on /ws/transcribe-live. If the client disconnects, pending transcription
+    and any council run (speculative or not) are cancelled.
     """
+    if await reject_if_audio_disabled(websocket):
+        return
     await websocket.accept()
-    accumulated_audio = io.BytesIO()
+    # Acks and backpressure come from the reader task, so they aren't held up by a decision
+    conn = ClientConnection(websocket)
+    conn.start()
+    session = None
     language = "en"
+    client_id = None
+    speculative = False
+    speculation = None  # (query, task) of the council started on a partial transcript
     weights = {
         "ethical": 0.2,
         "risk": 0.2,
@@ -226,130 +473,213 @@ async def websocket_transcribe_and_decide(websocket: WebSocket):
         "red_team": 0.2,
     }
     
+    def start_council(query: str) -> asyncio.Task:
+        # Snapshot the weights: a later "weights" message must not change a running council
+        return asyncio.create_task(run_council_graph(query, dict(weights)))
+    
+    def cancel_speculation():
+        nonlocal speculation
+        if speculation is not None:
+            speculation[1].cancel()
+            speculation = None
+    
     try:
         while True:
             try:
-                data = await websocket.receive_text()
-                message = json.loads(data)
+                frame, message = await conn.receive()
                 
-                if message.get("type") == "audio":
-                    audio_data = base64.b64decode(message.get("data", ""))
-                    accumulated_audio.write(audio_data)
-                    language = message.get("language", "en")
+                if frame is not None:
+                    if message is not None:
+                        language = message.get("language", "en")
+                    if session is None:
+                        audio = get_audio_processor()
+                        session = IncrementalTranscription(audio, audio.create_streaming_transcriber(
+                            language, audio_format=frame.audio_format, sample_rate=frame.sample_rate,
+                            client_id=client_id
+                        ))
+                    session.transcriber.language = language
+                    # Decode as audio arrives; transcription steps run in the background
+                    utterance_ended = session.feed(frame.payload)
+                    
+                    if utterance_ended:
+                        await conn.send_json({"type": "utterance_end"})
                     
-                    await websocket.send_json({
-                        "type": "ack",
-                        "bytes_received": len(audio_data)
+                    partial = session.take_partial()
+                    if partial is not None:
+                        await conn.send_json({
+                            "type": "transcription",
+                            "partial": True,
+                            "text": partial["text"],
+                            "committed": partial["committed"],
+                            "tentative": partial["tentative"],
+                            "language": partial.get("language") or language
+                        })
+                        # A pause makes the transcript stable enough to start the council early
+                        if speculative and partial["after_pause"] and partial["text"] and graph:
+                            if speculation is None or transcript_similarity(
+                                speculation[0], partial["text"]
+                            ) < SPECULATIVE_MIN_SIMILARITY:
+                                cancel_speculation()
+                                speculation = (partial["text"], start_council(partial["text"]))
+                                await conn.send_json({
+                                    "type": "speculation_started",
+                                    "query": partial["text"]
+                                })
+                
+                elif message.get("type") == "config":
+                    language = message.get("language", language)
+                    client_id = message.get("client_id", client_id)
+                    speculative = bool(message.get("speculative", speculative))
+                    if session is not None:
+                        session.transcriber.language = language
+                        session.transcriber.session_language.client_id = client_id
+                    await conn.send_json({
+                        "type": "config_updated",
+                        "language": language,
+                        "speculative": speculative
                     })
                 
                 elif message.get("type") == "weights":
-                    # Update decision weights
+                    # Update decision weights; a speculative run used the old ones
                     weights.update(message.get("weights", {}))
-                    await websocket.send_json({
+                    cancel_speculation()
+                    await conn.send_json({
                         "type": "weights_updated",
                         "weights": weights
                     })
                 
                 elif message.get("type") == "DECIDE":
-                    # Transcribe audio
-                    audio_bytes = accumulated_audio.getvalue()
-                    if not audio_bytes:
-                        await websocket.send_json({
+                    if session is None:
+                        await conn.send_json({
                             "type": "error",
                             "message": "No audio data"
                         })
                         break
                     
-                    # Transcribe
-                    transcription = await transcribe_audio_async(audio_bytes, language)
+                    # Transcribe the tail not yet covered by background steps
+                    transcription = await conn.guard(session.finish())
                     query = transcription.get("text", "")
                     
-                    await websocket.send_json({
+                    await conn.send_json({
                         "type": "transcribed",
                         "text": query,
-                        "language": transcription.get("language")
+                        "language": transcription.get("language") or language
                     })
                     
                     if query and graph:
                         try:
-                            # Make decision
-                            initial_state = {
-                                "user_query": query,
-                                "weights": weights,
-                                "agent_outputs": {},
-                                "final_answer": "",
-                            }
+                            council = None
+                            if speculation is not None:
+                                similarity = transcript_similarity(speculation[0], query)
+                                adopted = similarity >= SPECULATIVE_MIN_SIMILARITY
+                                if adopted:
+                                    council, speculation = speculation[1], None
+                                else:
+                                    cancel_speculation()
+                                await conn.send_json({
+                                    "type": "speculation",
+                                    "adopted": adopted,
+                                    "similarity": round(similarity, 3)
+                                })
+                            if council is None:
+                                council = start_council(query)
                             
-                            result = graph.invoke(initial_state)
+                            # Make decision
+                            result = await conn.guard(council)
+                            get_decision_store().record(
+                                query=result["user_query"],
+                                weights=result["weights"],
+                                agent_outputs=result["agent_outputs"],
+                                final_answer=result["final_answer"],
+                                timings=result.get("timings"),
+                                source="ws-transcribe-and-decide",
+                            )
                             
                             # Stream agent outputs
                             for agent, data in result["agent_outputs"].items():
-                                await websocket.send_json({
+                                await conn.send_json({
                                     "type": "agent_response",
                                     "agent": agent,
                                     "output": data["output"]
                                 })
                             
                             # Final decision
-                            await websocket.send_json({
+                            await conn.send_json({
                                 "type": "final_decision",
                                 "decision": result["final_answer"],
                                 "complete": True
                             })
                             
+                        except WebSocketDisconnect:
+                            raise
                         except Exception as e:
-                            await websocket.send_json({
+                            await conn.send_json({
                                 "type": "error",
                                 "message": f"Decision error: {str(e)}"
                             })
                     
                     break
                     
-            except json.JSONDecodeError:
-                await websocket.send_json({
+            except TranscriptionOverloaded as e:
+                await conn.send_json({
                     "type": "error",
-                    "message": "Invalid JSON"
+                    "code": "overloaded",
+                    "message": str(e)
                 })
+            except AudioTooLarge as e:
+                await reject_oversized_audio(conn, e)
+                break
                 
     except WebSocketDisconnect:
         print("Client disconnected from transcribe-and-decide")
     except Exception as e:
-        await websocket.send_json({
+        await conn.send_json({
             "type": "error",
             "message": str(e)
         })
+    finally:
+        cancel_speculation()
+        if session is not None:
+            session.close()
+        await conn.shutdown()
 
 
 @app.post("/transcribe", response_model=TranscriptionResponse)
-async def transcribe_audio(file: UploadFile = File(...), language: Optional[str] = None):
+async def transcribe_audio(
+    request: Request,
+    file: UploadFile = File(...),
+    language: Optional[str] = None,
+    model_size: str = Depends(allowed_model_size),
+    audio_format: Optional[str] = Query(None, pattern="^(pcm_s16le|f32le)$"),
+    latency_target_ms: Optional[float] = Query(None, gt=0)
+):
     """
     Transcribe audio file to text using OpenAI's Whisper API.
     
     - Supports MP3, MP4, WAV, MPEG, WEBM formats
     - Includes caching for repeated audio
     - Real-time streaming for instant feedback
-    - Max file size: 25MB
+    - Max file size: 25MB (SYNAPSE_MAX_AUDIO_MB), streamed to disk past a few MB
     
     Args:
         file: Audio file to transcribe
         language: Optional language code (e.g., 'en', 'es', 'fr')
+        model_size: Whisper model size (e.g. 'tiny' for quick clips, 'small' for accuracy),
+            or 'auto' to pick model and decoding options per request
+        audio_format: Set for raw 16 kHz mono uploads ('pcm_s16le' or 'f32le')
+        latency_target_ms: Latency the 'auto' policy aims for (SYNAPSE_LATENCY_TARGET_MS by default)
     
     Returns:
         TranscriptionResponse with transcribed text and metadata
     """
+    # Stream the upload into a capped buffer (413 when too large), hashing as it arrives
+    upload = await read_upload(file)
     try:
-        # Validate file
-        if file.size > 25 * 1024 * 1024:  # 25MB limit
-            raise HTTPException(status_code=413, detail="File too large (max 25MB)")
-        
-        # Read audio file
-        audio_bytes = await file.read()
-        
-        if not audio_bytes:
-            raise HTTPException(status_code=400, detail="Empty file uploaded")
-        
-        # Transcribe asynchronously
-        result = await transcribe_audio_async(audio_bytes, language)
+        # Transcribe asynchronously, decoding straight from the buffer (dropped if the client leaves)
+        result = await cancel_on_disconnect(request, get_audio_processor().transcribe_audio_async(
+            upload.view(), language, model_size, audio_format,
+            audio_hash=upload.digest, latency_target_ms=latency_target_ms
+        ))
         
         if "error" in result and result["error"]:
             raise HTTPException(status_code=400, detail=result["error"])
@@ -357,20 +687,156 @@ async def transcribe_audio(file: UploadFile = File(...), language: Optional[str]
         return TranscriptionResponse(
             text=result["text"],
             language=result.get("language", "en"),
-            cached=result.get("cached", False)
+            cached=result.get("cached", False),
+            model=result.get("model"),
+            profile=result.get("profile")
         )
     
-    except HTTPException:
+    except (HTTPException, TranscriptionOverloaded):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
+    finally:
+        upload.close()
+
+
+async def read_upload(file: UploadFile) -> AudioBuffer:
+    """
+    Copy an upload into a capped, incrementally hashed AudioBuffer in chunks,
+    so it is never held in memory whole. 413 past the cap, 400 if empty.
+    The multipart parser has already spooled the whole part by then;
+    UploadSizeLimit is what bounds how much it receives.
+    """
+    upload = AudioBuffer()
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            upload.write(chunk)
+    except AudioTooLarge as e:
+        upload.close()
+        raise HTTPException(status_code=413, detail=str(e))
+    finally:
+        await file.close()
+    if upload.size == 0:
+        upload.close()
+        raise HTTPException(status_code=400, detail="Empty file uploaded")
+    return upload
+
+
+def parse_weights(weights: Optional[str]) -> Weights:
+    """Parse a JSON weights form/query value; missing or invalid values use equal weights."""
+    default_weights = {
+        "ethical": 0.2,
+        "risk": 0.2,
+        "eq": 0.2,
+        "values": 0.2,
+        "red_team": 0.2,
+    }
+    
+    try:
+        if weights:
+            parsed_weights = json.loads(weights)
+            default_weights.update(parsed_weights)
+    except json.JSONDecodeError:
+        pass
+    return Weights(**default_weights)
+
+
+def _first_sentence(text: str) -> Optional[str]:
+    match = re.match(r"\s*(.+?[.!?])(?:\s|$)", text)
+    return match.group(1) if match else None
+
+
+@app.post("/transcribe-stream")
+async def transcribe_stream(
+    file: UploadFile = File(...),
+    language: Optional[str] = None,
+    model_size: str = Depends(allowed_model_size),
+    audio_format: Optional[str] = Query(None, pattern="^(pcm_s16le|f32le)$"),
+    decide_on_first_sentence: bool = False,
+    weights: Optional[str] = None,
+    latency_target_ms: Optional[float] = Query(None, gt=0)
+):
+    """
+    Transcribe an audio file and stream the result as newline-delimited JSON.
+    
+    Events, one JSON object per line:
+    - {"type": "segment", "start", "end", "text"} as each chunk is decoded
+      (timestamps in seconds; null for cached transcripts)
+    - {"type": "decision_started", "query"} when the council starts
+    - {"type": "done", "text", "language", "cached", "model"} with the full transcript
+    - {"type": "decision", "agent_outputs", "final_decision"} if requested
+    - {"type": "error", "error"} if transcription or the decision fails
+    
+    With `decide_on_first_sentence`, the council starts on the first complete
+    sentence while the rest of the file is still being transcribed (or on
+    the full text if it never ends a sentence).
+    """
+    audio = get_audio_processor()
+    upload = await read_upload(file)
+    decision_weights = parse_weights(weights) if decide_on_first_sentence else None
+    
+    events = audio.transcribe_stream_async(
+        upload.view(), language, model_size, audio_format,
+        audio_hash=upload.digest, latency_target_ms=latency_target_ms
+    )
+    try:
+        # Wait for the first event so a full queue is still a plain 429
+        first_event = await events.__anext__()
+    except BaseException:
+        upload.close()
+        raise
+    
+    def start_decision(query: str) -> asyncio.Task:
+        request = DecisionRequest(query=query[:5000], weights=decision_weights)
+        return asyncio.create_task(run_council_decision(request, source="transcribe-stream"))
+    
+    async def body():
+        decision_task = None
+        heard = ""
+        try:
+            event = first_event
+            while True:
+                yield json.dumps(event) + "\n"
+                if decide_on_first_sentence and decision_task is None:
+                    if event["type"] == "segment":
+                        heard = f"{heard} {event['text']}".strip()
+                        query = _first_sentence(heard)
+                    else:
+                        query = event.get("text") if event["type"] == "done" else None
+                    if query:
+                        decision_task = start_decision(query)
+                        yield json.dumps({"type": "decision_started", "query": query}) + "\n"
+                try:
+                    event = await events.__anext__()
+                except StopAsyncIteration:
+                    break
+            
+            if decision_task is not None:
+                try:
+                    decision = await decision_task
+                    yield json.dumps({"type": "decision", **decision.model_dump()}) + "\n"
+                except HTTPException as e:
+                    yield json.dumps({"type": "error", "error": e.detail}) + "\n"
+        finally:
+            await events.aclose()
+            upload.close()
+            if decision_task is not None and not decision_task.done():
+                decision_task.cancel()
+    
+    return StreamingResponse(body(), media_type="application/x-ndjson")
 
 
 @app.post("/transcribe-and-decide")
 async def transcribe_and_decide(
+    request: Request,
+    response: Response,
     file: UploadFile = File(...),
     weights: Optional[str] = None,
-    language: Optional[str] = None
+    language: Optional[str] = None,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     Convenience endpoint: Transcribe audio AND get decision in one call.
@@ -381,43 +847,69 @@ async def transcribe_and_decide(
         file: Audio file to transcribe
         weights: JSON string with agent weights (optional, uses defaults)
         language: Optional language code
+        idempotency_key: Optional `Idempotency-Key` header; retries with the
+            same key share one execution instead of starting a new council
     
     Returns:
         Combined transcription and decision response
     """
+    upload = await read_upload(file)
+    started = False
+    
+    async def work():
+        # The execution may outlive this request (retries attach to it), so it owns the buffer
+        try:
+            return await _transcribe_and_decide(
+                upload.view(), weights, language, idempotency_key, audio_hash=upload.digest
+            )
+        finally:
+            upload.close()
+    
+    def start():
+        nonlocal started
+        started = True
+        return work()
+    
+    try:
+        result, replayed = await cancel_on_disconnect(request, idempotency_store.run(
+            "transcribe-and-decide",
+            idempotency_key,
+            fingerprint(upload.digest, weights, language),
+            start,
+        ))
+    finally:
+        if not started:
+            upload.close()
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
+async def _transcribe_and_decide(
+    audio_bytes: bytes,
+    weights: Optional[str],
+    language: Optional[str],
+    run_id: Optional[str] = None,
+    audio_hash: Optional[str] = None
+):
     try:
-        import json
-        
         # Transcribe audio
-        audio_bytes = await file.read()
-        transcription = await transcribe_audio_async(audio_bytes, language)
+        transcription = await get_audio_processor().transcribe_audio_async(
+            audio_bytes, language, DEFAULT_MODEL_SIZE, audio_hash=audio_hash
+        )
         
         if "error" in transcription and transcription["error"]:
             raise HTTPException(status_code=400, detail=transcription["error"])
         
-        # Parse weights or use defaults
-        default_weights = {
-            "ethical": 0.2,
-            "risk": 0.2,
-            "eq": 0.2,
-            "values": 0.2,
-            "red_team": 0.2,
-        }
-        
-        try:
-            if weights:
-                parsed_weights = json.loads(weights)
-                default_weights.update(parsed_weights)
-        except json.JSONDecodeError:
-            pass
-        
         # Make decision
         decision_request = DecisionRequest(
             query=transcription["text"],
-            weights=Weights(**default_weights)
+            weights=parse_weights(weights)
         )
         
-        decision_response = await make_decision(decision_request)
+        decision_response = await run_council_decision(
+            decision_request, run_id=run_id, source="transcribe-and-decide"
+        )
         
         return {
             "transcribed_text": transcription["text"],
@@ -426,40 +918,81 @@ async def transcribe_and_decide(
             "decision": decision_response.dict()
         }
     
-    except HTTPException:
+    except (HTTPException, TranscriptionOverloaded):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed: {str(e)}")
 
 
 @app.post("/decision", response_model=DecisionResponse)
-async def make_decision(request: DecisionRequest):
+async def make_decision(
+    request: DecisionRequest,
+    http_request: Request,
+    response: Response,
+    x_thread_id: Optional[str] = Header(None, alias="X-Thread-Id"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
     """
     Execute the Synapse Council decision process.
     
     Takes a user query and agent weights, runs the LangGraph workflow,
     and returns all agent outputs plus the final aggregated decision.
+    
+    Clients that retry should resend the same `Idempotency-Key` header: a
+    retry attaches to the running execution or gets the stored response, and
+    a retry after a failure resumes from checkpoints (`X-Thread-Id` can be
+    used for resumption alone).
+    
+    If the client disconnects, a run without an `Idempotency-Key` is
+    cancelled: no further agent calls are made.
     """
+    result, replayed = await cancel_on_disconnect(http_request, idempotency_store.run(
+        "decision",
+        idempotency_key,
+        fingerprint(request.query, request.weights.model_dump()),
+        lambda: run_council_decision(request, run_id=x_thread_id or idempotency_key),
+    ))
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
+async def run_council_graph(query: str, weights: Dict[str, float], run_id: Optional[str] = None) -> Dict:
+    """
+    Run the council graph and return its final state, resuming checkpointed
+    progress for `run_id`. Cancelling the awaiting task cancels the run.
+    """
+    initial_state = {
+        "user_query": query,
+        "weights": weights,
+        "agent_outputs": {},
+        "timings": {},
+        "final_answer": "",
+    }
+    
+    # Execute graph (black box - no modifications), resuming a failed run if any.
+    # Runs in a worker thread so the event loop keeps serving (and attaching) retries.
+    cancel_event = threading.Event()
+    try:
+        return await asyncio.to_thread(invoke_with_resume, graph, initial_state, run_id, cancel_event)
+    except asyncio.CancelledError:
+        # The caller went away: the thread can't be interrupted, but the run stops at its next agent call
+        cancel_event.set()
+        raise
+
+
+async def run_council_decision(
+    request: DecisionRequest,
+    run_id: Optional[str] = None,
+    source: str = "decision"
+) -> DecisionResponse:
+    """Run the council for a request, resuming checkpointed progress for `run_id`."""
     if graph is None:
         raise HTTPException(status_code=503, detail="Graph not initialized")
     
     try:
-        # Prepare initial state
-        initial_state = {
-            "user_query": request.query,
-            "weights": {
-                "ethical": request.weights.ethical,
-                "risk": request.weights.risk,
-                "eq": request.weights.eq,
-                "values": request.weights.values,
-                "red_team": request.weights.red_team,
-            },
-            "agent_outputs": {},
-            "final_answer": "",
-        }
-        
-        # Execute graph (black box - no modifications)
-        result = graph.invoke(initial_state)
+        weights = request.weights.model_dump()
+        result = await run_council_graph(request.query, weights, run_id)
         
         # Extract and format response
         agent_outputs = AgentOutputs(
@@ -475,6 +1008,16 @@ async def make_decision(request: DecisionRequest):
             final_decision=result["final_answer"]
         )
         
+        # Persist to decision history (write-behind, off the request path)
+        get_decision_store().record(
+            query=request.query,
+            weights=weights,
+            agent_outputs=result["agent_outputs"],
+            final_answer=result["final_answer"],
+            timings=result.get("timings"),
+            source=source,
+        )
+        
         return response
         
     except KeyError as e:
@@ -489,16 +1032,63 @@ async def make_decision(request: DecisionRequest):
         )
 
 
+@app.get("/decisions")
+async def list_decisions(
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """List recorded decisions in a time range (unix seconds), newest first."""
+    return {"decisions": get_decision_store().by_time_range(start, end, limit)}
+
+
+@app.get("/decisions/by-hash/{query_hash}")
+async def decisions_by_hash(query_hash: str, limit: int = Query(100, ge=1, le=1000)):
+    """List recorded decisions for a normalized-query hash, newest first."""
+    return {"query_hash": query_hash, "decisions": get_decision_store().by_query_hash(query_hash, limit)}
+
+
+@app.get("/decisions/by-query")
+async def decisions_by_query(query: str, limit: int = Query(100, ge=1, le=1000)):
+    """List recorded decisions for a query (normalized before hashing), newest first."""
+    query_hash = get_query_hash(query)
+    return {"query_hash": query_hash, "decisions": get_decision_store().by_query_hash(query_hash, limit)}
+
+
+@app.get("/decision-history-stats")
+async def decision_history_statistics():
+    """Get decision history store statistics."""
+    return get_decision_store().stats()
+
+
+@app.get("/idempotency-stats")
+async def idempotency_statistics():
+    """Get idempotency key store statistics."""
+    return idempotency_store.stats()
+
+
+@app.get("/models")
+async def model_statistics():
+    """Get loaded Whisper models and registry memory usage."""
+    return get_audio_processor().get_model_stats()
+
+
+@app.get("/transcription-stats")
+async def transcription_statistics():
+    """Get transcription executor queue depth and throughput counters."""
+    return get_audio_processor().get_transcription_stats()
+
+
 @app.get("/cache-stats")
 async def cache_statistics():
     """Get transcription cache statistics."""
-    return get_cache_stats()
+    return get_audio_processor().get_cache_stats()
 
 
 @app.delete("/cache")
 async def clear_transcription_cache():
     """Clear the transcription cache."""
-    clear_cache()
+    get_audio_processor().clear_cache()
     return {"message": "Cache cleared"}
 
 
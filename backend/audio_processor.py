@@ -4,22 +4,41 @@ Supports real-time transcription with streaming and caching - NO API COSTS.
 """
 
 import os
-from typing import Optional, Dict, AsyncGenerator
-import whisper
-import whisper.audio
+import time
+import threading
+from typing import Optional, Dict, List, AsyncGenerator
 import asyncio
 from functools import lru_cache
-import hashlib
 import numpy as np
 import io
-import tempfile
 
-# Initialize Whisper model (loads once, cached)
-_whisper_model = None
+# whisper/torch are imported by the registry on first model load, not here,
+# so importing this module - and the API - stays fast
+from transcription.registry import model_registry
+from transcription.engines import get_engine
+from transcription.decoding import decode_audio, SAMPLE_RATE
+from transcription.streaming import StreamingTranscriber
+from transcription.vad import VAD_ENABLED, detect_speech, compact_silence
+from transcription.cache import TranscriptionCache, CachedTranscription, make_cache_key
+from transcription.disk_cache import DiskTranscriptionCache, DISK_CACHE_PATH
+from transcription.executor import transcription_executor, TranscriptionOverloaded, TranscriptionCancelled
+from transcription.batching import batch_scheduler, MAX_BATCH_SAMPLES
+from transcription.buffers import new_audio_hash
+from transcription.chunking import chunked_transcriber, stitch_texts, STREAM_CHUNK_SECONDS
+from transcription.policy import transcription_policy, latency_deadline, AUTO_MODEL_SIZE
+from transcription.policy import model_sizes as policy_model_sizes
+from transcription.language import client_languages
+from transcription.fingerprint import FINGERPRINT_ENABLED, audio_fingerprint, fingerprint_index
 
-def get_whisper_model(model_size: str = "base"):
+# Model sizes to load and warm up at startup (comma-separated, e.g. "tiny,base")
+PRELOAD_MODEL_SIZES = [size.strip() for size in os.getenv("SYNAPSE_WHISPER_PRELOAD", "").split(",") if size.strip()]
+
+
+def get_whisper_model(model_size: str = "base", device: Optional[str] = None, precision: Optional[str] = None):
     """
     Load Whisper model lazily. Uses 'base' by default for balance.
+    Each (size, device, precision) is cached separately in the model registry,
+    which evicts least recently used models beyond its memory budget.
     
     Model sizes (in GB):
     - tiny: 39MB (fastest, less accurate)
@@ -28,30 +47,136 @@ def get_whisper_model(model_size: str = "base"):
     - medium: 1.5GB (high accuracy)
     - large: 3.1GB (best accuracy, slow)
     """
-    global _whisper_model
-    if _whisper_model is None:
-        print(f"Loading Whisper {model_size} model (first load may take a moment)...")
-        _whisper_model = whisper.load_model(model_size)
-    return _whisper_model
+    return model_registry.get(model_size, device, precision)
+
+
+def get_model_stats() -> Dict:
+    """Get loaded-model registry statistics."""
+    stats = model_registry.stats()
+    stats["engine"] = get_engine().name
+    return stats
+
+def _warmup_audio(seconds: float = 1.0) -> np.ndarray:
+    """Synthetic 16 kHz clip (quiet tone over light noise) for warmup inference."""
+    t = np.arange(int(SAMPLE_RATE * seconds), dtype=np.float32) / SAMPLE_RATE
+    rng = np.random.default_rng(0)
+    tone = 0.1 * np.sin(2 * np.pi * 220.0 * t)
+    noise = 0.01 * rng.standard_normal(t.shape[0])
+    return (tone + noise).astype(np.float32)
+
+
+def warmup_models(model_sizes: List[str]) -> Dict[str, float]:
+    """
+    Load each model size and run one inference on synthetic audio, so the
+    first real request doesn't pay for model load or a cold first pass.
+    
+    Returns:
+        Dict mapping model size to warmup time in seconds
+    """
+    timings = {}
+    audio = _warmup_audio()
+    for model_size in model_sizes:
+        started = time.perf_counter()
+        get_engine().transcribe(audio, language="en", model_size=model_size)
+        timings[model_size] = round(time.perf_counter() - started, 2)
+        print(f"[AUDIO] Warmed up Whisper {model_size} in {timings[model_size]}s")
+    return timings
+
 
 # Cache for transcription results (in-memory)
-transcription_cache: Dict[str, str] = {}
+# Bounded LRU with TTL (SYNAPSE_TRANSCRIPTION_CACHE_MB / _TTL), keyed by audio, language and model
+transcription_cache = TranscriptionCache()
+
+# Second level: on-disk cache shared by all workers on this host (set
+# SYNAPSE_TRANSCRIPTION_DISK_CACHE to an empty string to disable)
+disk_cache = DiskTranscriptionCache() if DISK_CACHE_PATH else None
+
+
+def _cache_lookup(cache_key: str) -> Optional[CachedTranscription]:
+    """Check the memory cache, then the shared disk cache (promoting hits to memory)."""
+    cached = transcription_cache.get(cache_key)
+    if cached is not None or disk_cache is None:
+        return cached
+    stored = disk_cache.get(cache_key)
+    if stored is None:
+        return None
+    text, language = stored
+    transcription_cache.put(cache_key, text, language)
+    return CachedTranscription(text, language, 0, 0.0)
+
+
+def _cache_store(cache_key: str, text: str, language: Optional[str]):
+    transcription_cache.put(cache_key, text, language)
+    if disk_cache is not None:
+        disk_cache.put(cache_key, text, language)
+
+
+def _lookup_transcription(audio_hash: str, language: Optional[str], engine, model_size: str):
+    """
+    Cache lookup for a model size, or with 'auto' for every size the policy
+    may pick (most accurate first). Returns (cache_key, cached, size).
+    """
+    for size in (policy_model_sizes() if model_size == AUTO_MODEL_SIZE else [model_size]):
+        cache_key = make_cache_key(audio_hash, language, engine.label(size))
+        cached = _cache_lookup(cache_key)
+        if cached is not None:
+            return cache_key, cached, size
+    return cache_key, None, model_size
+
+
+def _lookup_fingerprint(fingerprint, audio_hash: str, language: Optional[str], engine, model_size: str):
+    """
+    Cache lookup through the fingerprint index: a transcript of the same
+    recording uploaded with different bytes (another codec or container).
+    Hits are also stored under this upload's own key. Returns (cached, size).
+    """
+    if fingerprint is None:
+        return None, model_size
+    match = fingerprint_index.match(fingerprint)
+    if match is None or match == audio_hash:
+        return None, model_size
+    _, cached, size = _lookup_transcription(match, language, engine, model_size)
+    if cached is not None:
+        _cache_store(make_cache_key(audio_hash, language, engine.label(size)), cached.text, cached.language)
+    return cached, size
+
+
+def _remember_fingerprint(fingerprint, audio_hash: str):
+    if fingerprint is not None:
+        fingerprint_index.add(fingerprint, audio_hash)
 
 
 def get_audio_hash(audio_bytes: bytes) -> str:
-    """Generate hash of audio bytes for caching."""
-    return hashlib.md5(audio_bytes).hexdigest()
+    """Generate hash of audio bytes for caching (same BLAKE2b as AudioBuffer.digest)."""
+    return new_audio_hash(audio_bytes).hexdigest()
 
 
-def transcribe_audio(audio_bytes: bytes, language: Optional[str] = None, model_size: str = "base") -> Dict:
+def transcribe_audio(
+    audio_bytes: bytes,
+    language: Optional[str] = None,
+    model_size: str = "base",
+    audio_format: Optional[str] = None,
+    sample_rate: int = SAMPLE_RATE,
+    audio_hash: Optional[str] = None,
+    stop: Optional[threading.Event] = None,
+    deadline: Optional[float] = None
+) -> Dict:
     """
     Transcribe audio bytes to text using FREE local Whisper model.
     No API keys, no costs, runs locally!
     
     Args:
-        audio_bytes: Raw audio data in bytes (supports WAV, MP3, MP4, WebM, etc.)
+        audio_bytes: Raw audio data (supports WAV, MP3, MP4, WebM, etc.); bytes or
+            a zero-copy view such as AudioBuffer.view()
         language: Optional language code (e.g., 'en', 'es', 'fr') - auto-detects if None
-        model_size: Whisper model size ('tiny', 'base', 'small', 'medium', 'large')
+        model_size: Whisper model size ('tiny', 'base', 'small', 'medium', 'large'),
+            or 'auto' to let the policy pick model and decoding options (see
+            transcription/policy.py; the result reports the 'profile')
+        audio_format: 'pcm_s16le' / 'f32le' for raw mono samples, None otherwise
+        sample_rate: Sample rate of raw PCM input
+        audio_hash: Content hash if already computed (e.g. AudioBuffer.digest)
+        stop: Set when the caller went away; inference that hasn't started is skipped
+        deadline: time.monotonic() by which the 'auto' policy aims to finish
     
     Returns:
         Dict with 'text' (transcribed text) and 'language' fields
@@ -59,64 +184,139 @@ def transcribe_audio(audio_bytes: bytes, language: Optional[str] = None, model_s
     try:
         print(f"[AUDIO] Starting transcription: {len(audio_bytes)} bytes, language={language}, model={model_size}")
         
+        engine = get_engine()
+        auto = model_size == AUTO_MODEL_SIZE
+        
         # Check cache first
-        audio_hash = get_audio_hash(audio_bytes)
-        if audio_hash in transcription_cache:
+        audio_hash = audio_hash or get_audio_hash(audio_bytes)
+        cache_key, cached, cached_size = _lookup_transcription(audio_hash, language, engine, model_size)
+        if cached is not None:
             print(f"[AUDIO] Cache hit! Returning cached result")
             return {
-                "text": transcription_cache[audio_hash],
-                "language": language or "en",
+                "text": cached.text,
+                "language": cached.language or language or "en",
+                "cached": True,
+                "model": cached_size
+            }
+        
+        # Decode in memory: WAV/raw PCM directly, other containers piped through ffmpeg
+        audio_data = decode_audio(audio_bytes, audio_format, sample_rate)
+        print(f"[AUDIO] Audio decoded: shape={audio_data.shape}")
+        
+        # Same recording under different bytes (re-encoded, other container)?
+        fingerprint = audio_fingerprint(audio_data) if FINGERPRINT_ENABLED else None
+        cached, cached_size = _lookup_fingerprint(fingerprint, audio_hash, language, engine, model_size)
+        if cached is not None:
+            print(f"[AUDIO] Fingerprint cache hit! Returning cached result")
+            return {
+                "text": cached.text,
+                "language": cached.language or language or "en",
                 "cached": True,
-                "model": model_size
+                "model": cached_size
             }
         
-        # Get Whisper model
-        print(f"[AUDIO] Loading Whisper model: {model_size}")
-        model = get_whisper_model(model_size)
-        print(f"[AUDIO] Model loaded successfully")
+        # Voice activity detection: skip speechless clips, trim silence
+        speech = None
+        if VAD_ENABLED:
+            speech = detect_speech(audio_data)
+            if not speech:
+                # Not cached: VAD is cheap to re-run, and a miss would stick for the cache TTL
+                print(f"[AUDIO] No speech detected, skipping inference")
+                return {
+                    "text": "",
+                    "language": language or "en",
+                    "cached": False,
+                    "model": model_size,
+                    "no_speech": True
+                }
         
-        # Save audio bytes to temporary file (Whisper needs file path or numpy array)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as tmp_file:
-            tmp_file.write(audio_bytes)
-            tmp_path = tmp_file.name
+        if stop is not None and stop.is_set():
+            raise TranscriptionCancelled("Transcription cancelled before inference")
         
-        try:
-            print(f"[AUDIO] Loading audio from temporary file: {tmp_path}")
-            # Load audio using Whisper's audio module (handles format conversion, resampling)
-            audio_data = whisper.audio.load_audio(tmp_path)
-            print(f"[AUDIO] Audio loaded: shape={audio_data.shape}")
+        chunked = chunked_transcriber.should_chunk(audio_data)
+        profile = None
+        options = {"temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)}
+        if auto:
+            # Pick model and decoding options from speech duration, queue depth and the deadline
+            speech_seconds = (sum(end - start for start, end in speech) if speech else len(audio_data)) / SAMPLE_RATE
+            profile, predicted_ms = transcription_policy.choose(
+                speech_seconds, deadline, chunked_transcriber.processes if chunked else 1, engine.label
+            )
+            model_size = profile.model_size
+            options = profile.options()
+            cache_key = make_cache_key(audio_hash, language, engine.label(model_size))
+            print(f"[AUDIO] Policy chose '{profile.name}' ({model_size}), predicted {predicted_ms:.0f} ms")
+        
+        result = None
+        if chunked:
+            # Long recording: transcribe pause-delimited chunks in parallel worker processes
+            result = chunked_transcriber.transcribe(
+                audio_data, language, engine.name, model_size, speech, stop, profile.options() if profile else None
+            )
+        else:
+            if speech is not None:
+                audio_data = compact_silence(audio_data, speech)
+                print(f"[AUDIO] Speech after VAD: {len(audio_data) / SAMPLE_RATE:.1f}s")
             
-            print(f"[AUDIO] Starting model.transcribe()...")
+            # Get Whisper model
+            print(f"[AUDIO] Loading {engine.name} model: {model_size}")
+            model_key = engine.model_key(model_size)
+            engine.load(model_size)
+            print(f"[AUDIO] Model loaded successfully: {model_key}")
+            
+            batchable = profile is None or profile.beam_size is None
+            if engine.supports_batching and batch_scheduler.enabled and batchable and len(audio_data) <= MAX_BATCH_SAMPLES:
+                # Short clip: decode together with other concurrent clips in one batched pass
+                print(f"[AUDIO] Queueing clip for batched decoding...")
+                result = batch_scheduler.transcribe(model_key, audio_data, language)
+                if result.pop("needs_fallback") and len(options["temperature"]) > 1:
+                    # Greedy batched decode looked unreliable; retry with the remaining fallback
+                    # temperatures (a profile without any keeps the batched result)
+                    result = None
+                    options["temperature"] = options["temperature"][1:]
+        
+        if result is None:
+            print(f"[AUDIO] Starting {engine.name} transcription...")
+            started = time.perf_counter()
             # Transcribe with optional language specification
-            result = model.transcribe(
+            result = engine.transcribe(
                 audio_data,
                 language=language,
+                model_size=model_size,
                 verbose=False,  # Suppress debug output
-                fp16=False  # Use fp32 for compatibility
+                **options
             )
-            print(f"[AUDIO] Transcription complete")
-            
-            text = result["text"].strip()
-            detected_language = result.get("language", language or "en")
-            
-            # Cache the result
-            transcription_cache[audio_hash] = text
-            print(f"[AUDIO] Result: '{text}'")
-            
-            return {
-                "text": text,
-                "language": detected_language,
-                "cached": False,
-                "model": model_size,
-                "confidence": "high"
-            }
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
+            transcription_policy.observe(
+                engine.label(model_size), len(audio_data) / SAMPLE_RATE, time.perf_counter() - started, profile
+            )
+        print(f"[AUDIO] Transcription complete")
+        
+        text = result["text"].strip()
+        detected_language = result.get("language") or language or "en"
+        
+        # Cache the result
+        _cache_store(cache_key, text, detected_language)
+        _remember_fingerprint(fingerprint, audio_hash)
+        print(f"[AUDIO] Result: '{text}'")
+        
+        response = {
+            "text": text,
+            "language": detected_language,
+            "cached": False,
+            "model": model_size,
+            "engine": engine.name,
+            "confidence": "high"
+        }
+        if profile is not None:
+            response["profile"] = profile.name
+        if "chunks" in result:
+            response["chunks"] = result["chunks"]
+            response["segments"] = result["segments"]
+        return response
     
+    except TranscriptionCancelled:
+        print(f"[AUDIO] Transcription cancelled, the client went away")
+        raise
     except Exception as e:
         error_msg = f"Transcription exception: {str(e)}"
         print(f"[AUDIO ERROR] {error_msg}")
@@ -130,25 +330,49 @@ def transcribe_audio(audio_bytes: bytes, language: Optional[str] = None, model_s
         }
 
 
-async def transcribe_audio_async(audio_bytes: bytes, language: Optional[str] = None, model_size: str = "base") -> Dict:
+async def transcribe_audio_async(
+    audio_bytes: bytes,
+    language: Optional[str] = None,
+    model_size: str = "base",
+    audio_format: Optional[str] = None,
+    sample_rate: int = SAMPLE_RATE,
+    audio_hash: Optional[str] = None,
+    latency_target_ms: Optional[float] = None
+) -> Dict:
     """
     Async wrapper for audio transcription to prevent blocking main thread.
-    Runs transcription in thread pool executor.
+    Runs transcription on the dedicated, bounded transcription executor.
     
     Args:
         audio_bytes: Raw audio data in bytes
         language: Optional language code
         model_size: Whisper model size
+        audio_format: Raw PCM format hint (see transcribe_audio)
+        sample_rate: Sample rate of raw PCM input
+        audio_hash: Content hash if already computed (e.g. AudioBuffer.digest)
+        latency_target_ms: Target for model_size='auto', counted from now (queue wait included)
     
     Returns:
         Dict with transcription result
+    
+    Raises:
+        TranscriptionOverloaded: if the transcription queue is full
     """
+    stop = threading.Event()
+    deadline = latency_deadline(latency_target_ms)
     try:
         print(f"[TRANSCRIBE] Starting async transcription: {len(audio_bytes)} bytes, language={language}, model={model_size}")
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, transcribe_audio, audio_bytes, language, model_size)
+        # Cancelling this coroutine drops the job if still queued, and stops it before inference otherwise
+        result = await transcription_executor.run(
+            transcribe_audio, audio_bytes, language, model_size, audio_format, sample_rate, audio_hash, stop, deadline
+        )
         print(f"[TRANSCRIBE] Result: {result}")
         return result
+    except asyncio.CancelledError:
+        stop.set()
+        raise
+    except TranscriptionOverloaded:
+        raise
     except Exception as e:
         error_msg = f"Async transcription error: {str(e)}"
         print(f"[TRANSCRIBE ERROR] {error_msg}")
@@ -159,15 +383,192 @@ async def transcribe_audio_async(audio_bytes: bytes, language: Optional[str] = N
         }
 
 
+def iter_transcription_segments(
+    audio_bytes: bytes,
+    language: Optional[str] = None,
+    model_size: str = "base",
+    audio_format: Optional[str] = None,
+    sample_rate: int = SAMPLE_RATE,
+    audio_hash: Optional[str] = None,
+    stop: Optional[threading.Event] = None,
+    deadline: Optional[float] = None
+):
+    """
+    Blocking generator behind streaming transcription: yields 'segment'
+    events (text with start/end seconds) chunk by chunk as they are decoded,
+    then one 'done' event with the full text. Setting `stop` abandons the
+    remaining chunks. With model_size 'auto' the policy picks the model size
+    and decoding options for the whole recording.
+    """
+    engine = get_engine()
+    audio_hash = audio_hash or get_audio_hash(audio_bytes)
+    cache_key, cached, cached_size = _lookup_transcription(audio_hash, language, engine, model_size)
+    if cached is not None:
+        # Cached transcripts have no timestamps: send the text as one segment
+        if cached.text:
+            yield {"type": "segment", "start": None, "end": None, "text": cached.text}
+        yield {"type": "done", "text": cached.text, "language": cached.language or language or "en",
+               "cached": True, "model": cached_size}
+        return
+    
+    audio_data = decode_audio(audio_bytes, audio_format, sample_rate)
+    fingerprint = audio_fingerprint(audio_data) if FINGERPRINT_ENABLED else None
+    cached, cached_size = _lookup_fingerprint(fingerprint, audio_hash, language, engine, model_size)
+    if cached is not None:
+        if cached.text:
+            yield {"type": "segment", "start": None, "end": None, "text": cached.text}
+        yield {"type": "done", "text": cached.text, "language": cached.language or language or "en",
+               "cached": True, "model": cached_size}
+        return
+    
+    speech = detect_speech(audio_data) if VAD_ENABLED else None
+    if speech == []:
+        yield {"type": "done", "text": "", "language": language or "en", "cached": False,
+               "model": model_size, "no_speech": True}
+        return
+    
+    profile = None
+    if model_size == AUTO_MODEL_SIZE:
+        speech_seconds = (sum(end - start for start, end in speech) if speech else len(audio_data)) / SAMPLE_RATE
+        parallelism = chunked_transcriber.processes if chunked_transcriber.enabled else 1
+        profile, _ = transcription_policy.choose(speech_seconds, deadline, parallelism, engine.label)
+        model_size = profile.model_size
+        cache_key = make_cache_key(audio_hash, language, engine.label(model_size))
+    
+    texts = []
+    detected_language = language
+    for chunk in chunked_transcriber.iter_transcribe(
+        audio_data, language, engine.name, model_size, STREAM_CHUNK_SECONDS, speech, stop,
+        profile.options() if profile else None
+    ):
+        detected_language = chunk["language"]
+        texts.append(chunk["text"])
+        for segment in chunk["segments"]:
+            yield {"type": "segment", **segment}
+    if stop is not None and stop.is_set():
+        return
+    
+    text = stitch_texts(texts)
+    _cache_store(cache_key, text, detected_language)
+    _remember_fingerprint(fingerprint, audio_hash)
+    done = {"type": "done", "text": text, "language": detected_language or "en", "cached": False,
+            "model": model_size, "engine": engine.name}
+    if profile is not None:
+        done["profile"] = profile.name
+    yield done
+
+
+async def transcribe_stream_async(
+    audio_bytes: bytes,
+    language: Optional[str] = None,
+    model_size: str = "base",
+    audio_format: Optional[str] = None,
+    sample_rate: int = SAMPLE_RATE,
+    audio_hash: Optional[str] = None,
+    latency_target_ms: Optional[float] = None
+) -> AsyncGenerator[Dict, None]:
+    """
+    Stream transcription events (see iter_transcription_segments) from the
+    transcription executor as they are produced. `latency_target_ms`
+    applies to model_size 'auto'.
+    
+    Raises:
+        TranscriptionOverloaded: if the transcription queue is full (before any event)
+    """
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    deadline = latency_deadline(latency_target_ms)
+    
+    def produce():
+        for event in iter_transcription_segments(
+            audio_bytes, language, model_size, audio_format, sample_rate, audio_hash, stop, deadline
+        ):
+            loop.call_soon_threadsafe(events.put_nowait, event)
+    
+    def finished(f):
+        if not f.cancelled() and f.exception() is not None:
+            print(f"[TRANSCRIBE ERROR] Streaming transcription failed: {f.exception()}")
+            loop.call_soon_threadsafe(events.put_nowait, {"type": "error", "error": str(f.exception())})
+        loop.call_soon_threadsafe(events.put_nowait, None)
+    
+    future = transcription_executor.submit(produce)
+    future.add_done_callback(finished)
+    try:
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield event
+    finally:
+        # Client went away: drop the job if still queued, else stop after the current chunk
+        stop.set()
+        future.cancel()
+
+
+def create_streaming_transcriber(
+    language: Optional[str] = None,
+    model_size: str = "base",
+    audio_format: Optional[str] = None,
+    sample_rate: int = SAMPLE_RATE,
+    client_id: Optional[str] = None
+) -> StreamingTranscriber:
+    """
+    Create per-connection incremental transcription state for live audio.
+    With no language, the detected one is reused for the session and
+    remembered for `client_id` once detection is confident.
+    """
+    return StreamingTranscriber(model_size, language, audio_format, sample_rate, client_id=client_id)
+
+
+async def streaming_step_async(transcriber: StreamingTranscriber, final: bool = False) -> Dict:
+    """
+    Run one incremental step (or the final step) of a streaming transcriber
+    on the transcription executor.
+    
+    Returns:
+        Dict with 'text', 'committed', 'tentative', 'language' and 'final'
+    
+    Raises:
+        TranscriptionOverloaded: if the transcription queue is full
+    """
+    try:
+        step = transcriber.finalize if final else transcriber.step
+        return await transcription_executor.run(step)
+    except TranscriptionOverloaded:
+        raise
+    except Exception as e:
+        error_msg = f"Streaming transcription error: {str(e)}"
+        print(f"[TRANSCRIBE ERROR] {error_msg}")
+        return {
+            "text": "",
+            "error": error_msg,
+            "language": transcriber.language
+        }
+
+
 def clear_cache():
     """Clear transcription cache."""
-    global transcription_cache
     transcription_cache.clear()
+    fingerprint_index.clear()
+    if disk_cache is not None:
+        disk_cache.clear()
+
+
+def get_transcription_stats() -> Dict:
+    """Get transcription executor queue and throughput statistics."""
+    stats = transcription_executor.stats()
+    stats["batching"] = batch_scheduler.stats()
+    stats["chunked"] = chunked_transcriber.stats()
+    stats["policy"] = transcription_policy.stats()
+    stats["languages"] = client_languages.stats()
+    return stats
 
 
 def get_cache_stats() -> Dict:
     """Get cache statistics."""
-    return {
-        "cached_items": len(transcription_cache),
-        "cache_size_kb": sum(len(v.encode()) for v in transcription_cache.values()) / 1024
-    }
+    stats = transcription_cache.stats()
+    stats["fingerprint"] = fingerprint_index.stats()
+    if disk_cache is not None:
+        stats["disk"] = disk_cache.stats()
+    return stats
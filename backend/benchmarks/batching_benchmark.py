@@ -0,0 +1,116 @@
+"""
+Compare throughput of concurrent short clips with and without micro-batching.
+
+Runs every clip of a directory (up to 30 s each) through `--concurrency`
+threads twice: once with one `engine.transcribe` per clip (torch threads
+split between the threads, as the executor does unbatched), and once
+through the batch scheduler (one batching thread with every core). Run from
+backend/ before setting SYNAPSE_WHISPER_BATCHING=true:
+
+    python -m benchmarks.batching_benchmark path/to/clips --concurrency 8 --rounds 3
+
+Only turn batching on if clips/s improves without hurting p95 latency.
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from transcription.decoding import decode_audio
+from transcription.engines import get_engine
+from transcription.executor import CPU_COUNT, TranscriptionExecutor
+from transcription.batching import BatchScheduler, MAX_BATCH_SAMPLES, BATCH_WINDOW_MS
+
+AUDIO_SUFFIXES = {".wav", ".mp3", ".m4a", ".mp4", ".webm", ".ogg", ".flac"}
+
+
+def load_clips(directory: Path) -> List[np.ndarray]:
+    clips = []
+    for path in sorted(directory.iterdir()):
+        if path.suffix.lower() in AUDIO_SUFFIXES:
+            samples = decode_audio(path.read_bytes())
+            if 0 < len(samples) <= MAX_BATCH_SAMPLES:
+                clips.append(samples)
+    return clips
+
+
+def run_mode(name: str, transcribe, clips: List[np.ndarray], executor: TranscriptionExecutor, rounds: int) -> Dict:
+    jobs = clips * rounds
+    latencies: List[float] = []
+
+    def timed(audio: np.ndarray):
+        started = time.perf_counter()
+        transcribe(audio)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for future in [executor.submit(timed, audio) for audio in jobs]:
+        future.result()
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": name,
+        "clips": len(jobs),
+        "seconds": round(elapsed, 2),
+        "clips_per_second": round(len(jobs) / elapsed, 2),
+        "p50_ms": round(1000 * float(np.percentile(latencies, 50)), 1),
+        "p95_ms": round(1000 * float(np.percentile(latencies, 95)), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dataset", type=Path, help="directory of audio clips (30 s or shorter)")
+    parser.add_argument("--model-size", default="base")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    import torch
+
+    clips = load_clips(args.dataset)
+    if not clips:
+        sys.exit(f"No audio clips of 30 s or less found in {args.dataset}")
+
+    engine = get_engine("whisper")
+    model_key = engine.model_key(args.model_size)
+    engine.transcribe(clips[0], language=args.language, model_size=args.model_size)
+    rounds = max(1, args.rounds)
+    # Same admission as the server: `concurrency` workers, the rest queued
+    executor = TranscriptionExecutor(workers=args.concurrency, max_queue=len(clips) * rounds)
+    scheduler = BatchScheduler(BATCH_WINDOW_MS, args.concurrency, batching=True, executor=executor)
+
+    torch.set_num_threads(max(1, CPU_COUNT // args.concurrency))
+    unbatched = run_mode(
+        "unbatched",
+        lambda audio: engine.transcribe(audio, language=args.language, model_size=args.model_size),
+        clips, executor, rounds,
+    )
+    torch.set_num_threads(CPU_COUNT)
+    batched = run_mode(
+        "batched",
+        lambda audio: scheduler.transcribe(model_key, audio, args.language),
+        clips, executor, rounds,
+    )
+    results = [unbatched, {**batched, "avg_batch_size": scheduler.stats()["avg_batch_size"]}]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'mode':<10} {'clips':>6} {'seconds':>8} {'clips/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for r in results:
+        print(
+            f"{r['mode']:<10} {r['clips']:>6} {r['seconds']:>8} {r['clips_per_second']:>8} "
+            f"{r['p50_ms']:>8} {r['p95_ms']:>8}"
+        )
+    print(f"speedup: {batched['clips_per_second'] / unbatched['clips_per_second']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Compare transcription engines on real-time factor and word error rate.
+
+The dataset is a directory of audio files, each with a reference transcript
+next to it (same name, .txt extension). Run from backend/:
+
+    python -m benchmarks.transcription_benchmark path/to/clips \\
+        --engines whisper,whisper-int8,faster-whisper --model-size base
+
+RTF is inference time divided by audio duration (below 1.0 is faster than
+real time). WER is the word-level edit distance to the reference divided by
+the reference length, after lowercasing and stripping punctuation. Each
+engine transcribes one clip untimed first so model loading isn't measured.
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+from transcription.decoding import decode_audio, SAMPLE_RATE
+from transcription.engines import ENGINES, get_engine
+
+
+def normalize_words(text: str) -> List[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_errors(reference: List[str], hypothesis: List[str]) -> int:
+    """Word-level Levenshtein distance (substitutions + insertions + deletions)."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def load_dataset(directory: Path) -> List[Dict]:
+    clips = []
+    for reference in sorted(directory.glob("*.txt")):
+        audio = next((p for p in reference.parent.glob(reference.stem + ".*") if p.suffix != ".txt"), None)
+        if audio is None:
+            continue
+        samples = decode_audio(audio.read_bytes())
+        clips.append({
+            "name": audio.name,
+            "audio": samples,
+            "seconds": len(samples) / SAMPLE_RATE,
+            "reference": normalize_words(reference.read_text()),
+        })
+    return clips
+
+
+def benchmark_engine(name: str, model_size: str, clips: List[Dict], language: str) -> Dict:
+    engine = get_engine(name)
+    engine.transcribe(clips[0]["audio"], language=language, model_size=model_size)
+
+    audio_seconds = inference_seconds = 0.0
+    errors = reference_words = 0
+    for clip in clips:
+        started = time.perf_counter()
+        result = engine.transcribe(clip["audio"], language=language, model_size=model_size)
+        elapsed = time.perf_counter() - started
+        audio_seconds += clip["seconds"]
+        inference_seconds += elapsed
+        errors += word_errors(clip["reference"], normalize_words(result["text"]))
+        reference_words += len(clip["reference"])
+    return {
+        "engine": name,
+        "model_size": model_size,
+        "clips": len(clips),
+        "audio_seconds": round(audio_seconds, 1),
+        "inference_seconds": round(inference_seconds, 2),
+        "rtf": round(inference_seconds / audio_seconds, 3),
+        "wer": round(errors / max(1, reference_words), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dataset", type=Path, help="directory of audio files with .txt references")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="comma-separated engine names")
+    parser.add_argument("--model-size", default="base")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    clips = load_dataset(args.dataset)
+    if not clips:
+        sys.exit(f"No audio files with .txt references found in {args.dataset}")
+
+    results = []
+    for name in [e.strip() for e in args.engines.split(",") if e.strip()]:
+        try:
+            results.append(benchmark_engine(name, args.model_size, clips, args.language))
+        except Exception as e:
+            print(f"[BENCHMARK] {name} failed: {e}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'engine':<16} {'model':<8} {'clips':>5} {'audio s':>8} {'infer s':>8} {'RTF':>7} {'WER':>7}")
+    for r in results:
+        print(
+            f"{r['engine']:<16} {r['model_size']:<8} {r['clips']:>5} {r['audio_seconds']:>8} "
+            f"{r['inference_seconds']:>8} {r['rtf']:>7.3f} {r['wer']:>7.2%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
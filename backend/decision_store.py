@@ -0,0 +1,201 @@
+"""
+Persistent decision history backed by an embedded SQLite database (WAL mode).
+
+Every council decision is recorded with its query, a hash of the normalized
+query, the weights, per-agent outputs, node timings and the final answer.
+Writes are queued and flushed in batches by a background thread, so recording
+a decision never blocks the request path.
+"""
+
+import os
+import json
+import time
+import queue
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+backend_dir = Path(__file__).resolve().parent
+
+HISTORY_DB_PATH = os.getenv("SYNAPSE_HISTORY_DB", str(backend_dir / "data" / "decision_history.db"))
+HISTORY_BATCH_SIZE = int(os.getenv("SYNAPSE_HISTORY_BATCH_SIZE", "64"))
+HISTORY_FLUSH_INTERVAL = float(os.getenv("SYNAPSE_HISTORY_FLUSH_INTERVAL", "0.5"))
+HISTORY_QUEUE_SIZE = int(os.getenv("SYNAPSE_HISTORY_QUEUE_SIZE", "10000"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    query TEXT NOT NULL,
+    query_hash TEXT NOT NULL,
+    weights TEXT NOT NULL,
+    agent_outputs TEXT NOT NULL,
+    timings TEXT NOT NULL,
+    final_answer TEXT NOT NULL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_decisions_created_at ON decisions (created_at);
+CREATE INDEX IF NOT EXISTS idx_decisions_query_hash ON decisions (query_hash, created_at);
+"""
+
+_COLUMNS = ("id", "created_at", "query", "query_hash", "weights", "agent_outputs", "timings", "final_answer", "source")
+_JSON_COLUMNS = ("weights", "agent_outputs", "timings")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries share a hash."""
+    return " ".join(query.lower().split())
+
+
+def get_query_hash(query: str) -> str:
+    """Stable hash of the normalized query (used for lookups and cache warm-up)."""
+    return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _row_to_dict(row) -> Dict[str, Any]:
+    record = dict(zip(_COLUMNS, row))
+    for column in _JSON_COLUMNS:
+        record[column] = json.loads(record[column])
+    return record
+
+
+class DecisionStore:
+    """SQLite decision history with a write-behind batching thread."""
+
+    def __init__(self, path: str = HISTORY_DB_PATH):
+        self.path = path
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=HISTORY_QUEUE_SIZE)
+        self._writer: Optional[threading.Thread] = None
+        self._read_lock = threading.Lock()
+        self._read_conn = _connect(path)
+        self.dropped = 0
+
+    def start(self):
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="decision-store-writer", daemon=True)
+            self._writer.start()
+
+    def stop(self):
+        """Flush pending records and stop the writer thread."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        self._read_conn.close()
+
+    def record(
+        self,
+        query: str,
+        weights: Dict[str, float],
+        agent_outputs: Dict[str, Any],
+        final_answer: str,
+        timings: Optional[Dict[str, float]] = None,
+        source: Optional[str] = None,
+    ):
+        """Queue a decision for persistence. Never blocks; drops the record if the queue is full."""
+        row = (
+            time.time(),
+            query,
+            get_query_hash(query),
+            json.dumps(weights),
+            json.dumps(agent_outputs),
+            json.dumps(timings or {}),
+            final_answer,
+            source,
+        )
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+            print(f"[HISTORY] Write queue full, dropped decision record ({self.dropped} dropped so far)")
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        running = True
+        while running:
+            batch = []
+            try:
+                item = self._queue.get(timeout=HISTORY_FLUSH_INTERVAL)
+            except queue.Empty:
+                continue
+            if item is None:
+                running = False
+            else:
+                batch.append(item)
+            # Drain whatever else is already waiting, up to the batch size
+            while running and len(batch) < HISTORY_BATCH_SIZE:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                else:
+                    batch.append(item)
+            if batch:
+                try:
+                    with conn:
+                        conn.executemany(
+                            "INSERT INTO decisions (created_at, query, query_hash, weights, agent_outputs, "
+                            "timings, final_answer, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            batch,
+                        )
+                except sqlite3.Error as e:
+                    print(f"[HISTORY ERROR] Failed to write {len(batch)} decision records: {e}")
+        conn.close()
+
+    def _select(self, where: str, params: tuple, limit: int) -> List[Dict[str, Any]]:
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM decisions WHERE {where} ORDER BY created_at DESC LIMIT ?"
+        with self._read_lock:
+            rows = self._read_conn.execute(sql, params + (limit,)).fetchall()
+        return [_row_to_dict(row) for row in rows]
+
+    def by_time_range(self, start: Optional[float] = None, end: Optional[float] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Decisions created in [start, end) (unix seconds), newest first."""
+        return self._select(
+            "created_at >= ? AND created_at < ?",
+            (start if start is not None else 0.0, end if end is not None else float("inf")),
+            limit,
+        )
+
+    def by_query_hash(self, query_hash: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Decisions whose normalized query hashes to `query_hash`, newest first."""
+        return self._select("query_hash = ?", (query_hash,), limit)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._read_lock:
+            total = self._read_conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+        return {
+            "stored_decisions": total,
+            "pending_writes": self._queue.qsize(),
+            "dropped_writes": self.dropped,
+        }
+
+
+# Process-wide store (started in the API lifespan)
+_decision_store: Optional[DecisionStore] = None
+
+
+def get_decision_store() -> DecisionStore:
+    global _decision_store
+    if _decision_store is None:
+        _decision_store = DecisionStore()
+    return _decision_store
+
+
+def close_decision_store():
+    global _decision_store
+    if _decision_store is not None:
+        _decision_store.stop()
+        _decision_store = None
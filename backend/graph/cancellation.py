@@ -0,0 +1,31 @@
+"""
+Cooperative cancellation for council runs.
+
+A run started for a client carries a threading.Event in its LangGraph config
+(configurable["cancel_event"]). When the client goes away the event is set,
+and nodes check it before each upstream agent call: the run stops with
+RunCancelled instead of spending more requests on an answer nobody will
+read. A request already in flight finishes, but nothing after it starts.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+
+class RunCancelled(Exception):
+    """Raised inside a council run whose client has gone away."""
+
+
+def cancel_config(cancel_event: Optional[threading.Event]) -> Dict[str, Any]:
+    """`configurable` entries that attach `cancel_event` to a run."""
+    return {"cancel_event": cancel_event} if cancel_event is not None else {}
+
+
+def get_cancel_event(config: Optional[Dict[str, Any]]) -> Optional[threading.Event]:
+    return ((config or {}).get("configurable") or {}).get("cancel_event")
+
+
+def raise_if_cancelled(config: Optional[Dict[str, Any]], stage: str):
+    event = get_cancel_event(config)
+    if event is not None and event.is_set():
+        raise RunCancelled(f"Council run cancelled before {stage}")
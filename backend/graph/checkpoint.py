@@ -0,0 +1,149 @@
+"""
+Persistent LangGraph checkpointing for council runs.
+
+With a checkpointer compiled into the graph, every completed node is saved
+under the run's thread id. If a later node fails (typically the aggregator),
+retrying with the same thread id resumes from the saved state instead of
+calling the already-finished agents again.
+
+Failed runs with a caller id keep their checkpoints for a retry, but not
+forever: threads whose newest checkpoint is older than SYNAPSE_CHECKPOINT_TTL
+are pruned (checked at most every SYNAPSE_CHECKPOINT_PRUNE_SECONDS).
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from graph.cancellation import cancel_config
+
+backend_dir = Path(__file__).resolve().parent.parent
+
+CHECKPOINT_DB_PATH = os.getenv("SYNAPSE_CHECKPOINT_DB", str(backend_dir / "data" / "checkpoints.db"))
+# How long a failed run stays resumable
+CHECKPOINT_TTL = float(os.getenv("SYNAPSE_CHECKPOINT_TTL", "86400"))
+CHECKPOINT_PRUNE_INTERVAL = float(os.getenv("SYNAPSE_CHECKPOINT_PRUNE_SECONDS", "600"))
+
+_last_prune = 0.0
+_prune_lock = threading.Lock()
+
+
+def get_checkpointer(path: str = CHECKPOINT_DB_PATH):
+    """
+    Local persistent checkpointer (SQLite). Falls back to an in-memory saver
+    when `langgraph-checkpoint-sqlite` is not installed, which still lets a
+    retry on the same worker resume.
+    """
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError:
+        from langgraph.checkpoint.memory import MemorySaver
+        print("[CHECKPOINT] langgraph-checkpoint-sqlite not installed, using in-memory checkpoints")
+        return MemorySaver()
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return SqliteSaver(conn)
+
+
+def _input_fingerprint(initial_state: Dict[str, Any]) -> str:
+    payload = json.dumps(
+        {"user_query": initial_state["user_query"], "weights": initial_state["weights"]},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _discard_thread(graph, thread_id: str):
+    delete_thread = getattr(graph.checkpointer, "delete_thread", None)
+    if delete_thread is not None:
+        try:
+            delete_thread(thread_id)
+        except Exception as e:
+            print(f"[CHECKPOINT] Could not prune thread {thread_id}: {e}")
+
+
+def prune_stale_threads(checkpointer, ttl_seconds: float = CHECKPOINT_TTL) -> int:
+    """Delete threads whose newest checkpoint is older than `ttl_seconds`. Returns how many."""
+    delete_thread = getattr(checkpointer, "delete_thread", None)
+    if delete_thread is None:
+        return 0
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=ttl_seconds)
+    newest: Dict[str, datetime] = {}
+    for item in checkpointer.list(None):
+        thread_id = item.config["configurable"]["thread_id"]
+        saved_at = datetime.fromisoformat(item.checkpoint["ts"])
+        if thread_id not in newest or saved_at > newest[thread_id]:
+            newest[thread_id] = saved_at
+    stale = [thread_id for thread_id, saved_at in newest.items() if saved_at < cutoff]
+    for thread_id in stale:
+        delete_thread(thread_id)
+    if stale:
+        print(f"[CHECKPOINT] Pruned {len(stale)} threads not resumed within {ttl_seconds:.0f}s")
+    return len(stale)
+
+
+def _maybe_prune(graph):
+    global _last_prune
+    with _prune_lock:
+        now = time.monotonic()
+        if _last_prune and now - _last_prune < CHECKPOINT_PRUNE_INTERVAL:
+            return
+        _last_prune = now
+        try:
+            prune_stale_threads(graph.checkpointer)
+        except Exception as e:
+            print(f"[CHECKPOINT] Could not prune stale threads: {e}")
+
+
+def invoke_with_resume(
+    graph,
+    initial_state: Dict[str, Any],
+    run_id: Optional[str] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> Dict[str, Any]:
+    """
+    Run the council graph under a checkpoint thread.
+
+    The thread id combines the caller's run id (retry/idempotency id) with a
+    fingerprint of the query and weights, so a retry only resumes a run that
+    was started with the same input. Threads are pruned once a run completes;
+    only failed runs with a run id keep their checkpoints around for the
+    retry (until CHECKPOINT_TTL). Setting `cancel_event` stops the run at
+    the next agent call (RunCancelled).
+    """
+    if graph.checkpointer is None:
+        return graph.invoke(initial_state, {"configurable": cancel_config(cancel_event)})
+
+    _maybe_prune(graph)
+    thread_id = f"{run_id or uuid.uuid4().hex}:{_input_fingerprint(initial_state)}"
+    config = {"configurable": {"thread_id": thread_id, **cancel_config(cancel_event)}}
+
+    try:
+        snapshot = graph.get_state(config)
+        if snapshot.next:
+            # A previous attempt stopped part-way: resume from the pending nodes
+            print(f"[CHECKPOINT] Resuming thread {thread_id} at {list(snapshot.next)}")
+            result = graph.invoke(None, config)
+        elif snapshot.values.get("final_answer"):
+            # A previous attempt finished but the response never reached the client
+            print(f"[CHECKPOINT] Thread {thread_id} already complete, returning saved result")
+            result = snapshot.values
+        else:
+            result = graph.invoke(initial_state, config)
+    except BaseException:
+        if run_id is None:
+            # Without a caller id nobody can resume it
+            _discard_thread(graph, thread_id)
+        raise
+
+    _discard_thread(graph, thread_id)
+    return result
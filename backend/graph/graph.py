@@ -11,7 +11,11 @@ from graph.nodes import (
 )
 
 
-def build_synapse_council_graph():
+def build_synapse_council_graph(checkpointer=None):
+    """
+    Build the council graph. Pass a checkpointer (see graph.checkpoint) to
+    persist node results so failed runs can be resumed by thread id.
+    """
     graph = StateGraph(SynapseState)
 
     # Register nodes
@@ -40,4 +44,4 @@ def build_synapse_council_graph():
     # End
     graph.add_edge("aggregator", END)
 
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
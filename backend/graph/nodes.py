@@ -5,57 +5,82 @@ from agents.red_team_agent import run_red_team_agent
 from agents.value_alignment_agent import run_values_agent
 from agents.aggregator import run_aggregator_agent
 from graph.state import SynapseState
+from graph.cancellation import raise_if_cancelled
+from langchain_core.runnables import RunnableConfig
+import time
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
 
 # ---------- INDIVIDUAL AGENT NODES ----------
-def ethical_node(state: SynapseState):
-    output = run_ethical_agent(state["user_query"])
+def ethical_node(state: SynapseState, config: RunnableConfig):
+    raise_if_cancelled(config, "ethical")
+    started = time.perf_counter()
+    output = run_ethical_agent(state["user_query"], check_cancelled=lambda: raise_if_cancelled(config, "ethical"))
     return {
         "agent_outputs": {
             "ethical": {"output": output}
-        }
+        },
+        "timings": {"ethical": _elapsed_ms(started)}
     }
 
-def eq_node(state: SynapseState):
-    output = run_eq_agent(state["user_query"])
+def eq_node(state: SynapseState, config: RunnableConfig):
+    raise_if_cancelled(config, "eq")
+    started = time.perf_counter()
+    output = run_eq_agent(state["user_query"], check_cancelled=lambda: raise_if_cancelled(config, "eq"))
     return {
         "agent_outputs": {
             "eq": {"output": output}
-        }
+        },
+        "timings": {"eq": _elapsed_ms(started)}
     }
 
-def risk_node(state: SynapseState):
-    output = run_risk_agent(state["user_query"])
+def risk_node(state: SynapseState, config: RunnableConfig):
+    raise_if_cancelled(config, "risk")
+    started = time.perf_counter()
+    output = run_risk_agent(state["user_query"], check_cancelled=lambda: raise_if_cancelled(config, "risk"))
     return {
         "agent_outputs": {
             "risk": {"output": output}
-        }
+        },
+        "timings": {"risk": _elapsed_ms(started)}
     }
 
-def red_team_node(state: SynapseState):
-    output = run_red_team_agent(state["user_query"])
+def red_team_node(state: SynapseState, config: RunnableConfig):
+    raise_if_cancelled(config, "red_team")
+    started = time.perf_counter()
+    output = run_red_team_agent(state["user_query"], check_cancelled=lambda: raise_if_cancelled(config, "red_team"))
     return {
         "agent_outputs": {
             "red_team": {"output": output}
-        }
+        },
+        "timings": {"red_team": _elapsed_ms(started)}
     }
 
-def values_node(state: SynapseState):
-    output = run_values_agent(state["user_query"])
+def values_node(state: SynapseState, config: RunnableConfig):
+    raise_if_cancelled(config, "values")
+    started = time.perf_counter()
+    output = run_values_agent(state["user_query"], check_cancelled=lambda: raise_if_cancelled(config, "values"))
     return {
         "agent_outputs": {
             "values": {"output": output}
-        }
+        },
+        "timings": {"values": _elapsed_ms(started)}
     }
 
 # ---------- FINAL AGGREGATOR NODE ----------
-def aggregator_node(state: SynapseState):
+def aggregator_node(state: SynapseState, config: RunnableConfig):
+    raise_if_cancelled(config, "aggregator")
     payload = {
         "user_query": state["user_query"],
         "weights": state["weights"],
         "agent_outputs": state["agent_outputs"],
     }
-    final_answer = run_aggregator_agent(payload)
+    started = time.perf_counter()
+    final_answer = run_aggregator_agent(payload, check_cancelled=lambda: raise_if_cancelled(config, "aggregator"))
     return {
         "final_answer": final_answer,
-        "agent_outputs": state["agent_outputs"] 
+        "agent_outputs": state["agent_outputs"],
+        "timings": {"aggregator": _elapsed_ms(started)}
     }
\ No newline at end of file
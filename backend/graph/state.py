@@ -5,6 +5,10 @@ def merge_agent_outputs(left: Dict[str, Dict[str, Any]], right: Dict[str, Dict[s
     """Merge agent outputs from parallel nodes."""
     return {**left, **right}
 
+def merge_timings(left: Dict[str, float], right: Dict[str, float]) -> Dict[str, float]:
+    """Merge per-node timings from parallel nodes."""
+    return {**(left or {}), **(right or {})}
+
 class SynapseState(TypedDict):
     # User input
     user_query: str
@@ -12,5 +16,7 @@ class SynapseState(TypedDict):
     weights: Dict[str, float]
     # Outputs from individual agents - with reducer for parallel updates
     agent_outputs: Annotated[Dict[str, Dict[str, Any]], merge_agent_outputs]
+    # Wall-clock time per node in milliseconds - with reducer for parallel updates
+    timings: Annotated[Dict[str, float], merge_timings]
     # Final decision
-    final_answer: str
\ No newline at end of file
+    final_answer: str
@@ -0,0 +1,268 @@
+"""
+Idempotency-Key support for expensive endpoints.
+
+The first request with a given key starts the work; retries with the same key
+either attach to the still-running execution or get the stored response back
+until the entry expires. Failed executions are forgotten so a retry can try
+again (and, for decisions, resume from checkpoints).
+
+Running executions are tracked in this worker's memory, so same-worker
+retries attach to them directly. Across workers, keys are shared through
+SQLite (SYNAPSE_IDEMPOTENCY_DB; empty for memory only): the worker that
+claims a key holds an in-flight marker with a heartbeat and stores the
+response when done. A retry that lands on another worker waits for that
+response, or takes the key over if the owner stops heartbeating (it died),
+resuming the decision from checkpoints.
+"""
+
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+
+backend_dir = Path(__file__).resolve().parent
+
+IDEMPOTENCY_TTL = float(os.getenv("SYNAPSE_IDEMPOTENCY_TTL", "3600"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("SYNAPSE_IDEMPOTENCY_MAX_KEYS", "10000"))
+IDEMPOTENCY_DB_PATH = os.getenv("SYNAPSE_IDEMPOTENCY_DB", str(backend_dir / "data" / "idempotency.db"))
+# An in-flight marker not refreshed for this long belongs to a dead worker and is taken over
+IDEMPOTENCY_LEASE = float(os.getenv("SYNAPSE_IDEMPOTENCY_LEASE_SECONDS", "30"))
+# How often a retry checks on an execution running on another worker
+SHARED_POLL_SECONDS = 0.25
+PURGE_INTERVAL = 60.0
+MAX_KEY_LENGTH = 255
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    response TEXT,
+    heartbeat REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_idempotency_expires_at ON idempotency_keys (expires_at);
+"""
+
+
+def fingerprint(*parts: Any) -> str:
+    """Hash of the request payload, used to reject a key reused for a different request."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else repr(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class _Entry:
+    def __init__(self, request_fingerprint: str, task: "asyncio.Task"):
+        self.fingerprint = request_fingerprint
+        self.task = task
+        self.expires_at = time.monotonic() + IDEMPOTENCY_TTL
+
+
+class SharedKeys:
+    """
+    In-flight markers and completed responses in SQLite, shared by every
+    worker on the host. A row with a NULL response is in flight; its owner
+    refreshes `heartbeat` until it stores the response or deletes the row.
+    """
+
+    def __init__(self, path: str = IDEMPOTENCY_DB_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def claim(self, key: str, request_fingerprint: str) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        Claim `key` for this worker: succeeds if it is new, expired, or in
+        flight on a worker that stopped heartbeating. Returns None when
+        claimed, otherwise the existing (fingerprint, response JSON or None).
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                if now - self._last_purge > PURGE_INTERVAL:
+                    conn.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (now,))
+                    self._last_purge = now
+                claimed = conn.execute(
+                    "INSERT INTO idempotency_keys (key, fingerprint, response, heartbeat, expires_at) "
+                    "VALUES (?, ?, NULL, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                    "fingerprint = excluded.fingerprint, response = NULL, "
+                    "heartbeat = excluded.heartbeat, expires_at = excluded.expires_at "
+                    "WHERE idempotency_keys.expires_at <= ? "
+                    "OR (idempotency_keys.response IS NULL AND idempotency_keys.heartbeat <= ?)",
+                    (key, request_fingerprint, now, now + IDEMPOTENCY_TTL, now, now - IDEMPOTENCY_LEASE),
+                ).rowcount
+                if claimed:
+                    return None
+                return conn.execute(
+                    "SELECT fingerprint, response FROM idempotency_keys WHERE key = ?", (key,)
+                ).fetchone()
+
+    def heartbeat(self, key: str):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE idempotency_keys SET heartbeat = ? WHERE key = ? AND response IS NULL", (time.time(), key)
+            )
+
+    def complete(self, key: str, response: str):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE idempotency_keys SET response = ?, expires_at = ? WHERE key = ?",
+                (response, time.time() + IDEMPOTENCY_TTL, key),
+            )
+
+    def release(self, key: str):
+        """Forget a failed execution so the next retry can claim the key."""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM idempotency_keys WHERE key = ? AND response IS NULL", (key,))
+
+
+class IdempotencyStore:
+    """Keyed in-flight/completed results with TTL expiry, shared across workers via SharedKeys."""
+
+    def __init__(self, shared: Optional[SharedKeys] = None):
+        self._entries: Dict[str, _Entry] = {}
+        self.shared = shared
+        self.replays = 0
+        self.attached = 0
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for key in [k for k, e in self._entries.items() if e.task.done() and e.expires_at <= now]:
+            del self._entries[key]
+        # Hard cap: drop the oldest completed entries first
+        if len(self._entries) > IDEMPOTENCY_MAX_KEYS:
+            completed = sorted(
+                (e.expires_at, k) for k, e in self._entries.items() if e.task.done()
+            )
+            for _, key in completed[: len(self._entries) - IDEMPOTENCY_MAX_KEYS]:
+                del self._entries[key]
+
+    async def run(
+        self,
+        scope: str,
+        key: Optional[str],
+        request_fingerprint: str,
+        work: Callable[[], Awaitable[Any]],
+    ) -> Tuple[Any, bool]:
+        """
+        Execute `work` once per (scope, key). Returns (result, replayed) where
+        `replayed` is True when the result came from an earlier request.
+        """
+        if not key:
+            return await work(), False
+        if len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail=f"Idempotency-Key too long (max {MAX_KEY_LENGTH})")
+
+        self._evict_expired()
+        store_key = f"{scope}:{key}"
+        entry = self._entries.get(store_key)
+
+        if entry is not None:
+            if entry.fingerprint != request_fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used with a different request"
+                )
+            if entry.task.done():
+                self.replays += 1
+                print(f"[IDEMPOTENCY] Replaying stored result for {store_key}")
+            else:
+                self.attached += 1
+                print(f"[IDEMPOTENCY] Attaching to in-flight execution for {store_key}")
+            # shield: a disconnecting retry must not cancel the shared execution
+            return await asyncio.shield(entry.task), True
+
+        if self.shared is not None:
+            stored = await self._claim_shared(store_key, request_fingerprint)
+            if stored is not None:
+                return stored, True
+
+        task = asyncio.ensure_future(work())
+        self._entries[store_key] = _Entry(request_fingerprint, task)
+        task.add_done_callback(lambda t: self._finished(store_key, t))
+        if self.shared is not None:
+            asyncio.ensure_future(self._keep_alive(store_key, task))
+        return await asyncio.shield(task), False
+
+    async def _claim_shared(self, store_key: str, request_fingerprint: str) -> Optional[Any]:
+        """
+        Claim the key across workers (returns None), or return the response
+        stored by another worker, waiting while that worker is still running.
+        """
+        waiting = False
+        while True:
+            existing = self.shared.claim(store_key, request_fingerprint)
+            if existing is None:
+                return None
+            existing_fingerprint, response = existing
+            if existing_fingerprint != request_fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used with a different request"
+                )
+            if response is not None:
+                self.replays += 1
+                print(f"[IDEMPOTENCY] Replaying result stored by another worker for {store_key}")
+                return json.loads(response)
+            if not waiting:
+                waiting = True
+                self.attached += 1
+                print(f"[IDEMPOTENCY] Waiting for in-flight execution on another worker for {store_key}")
+            await asyncio.sleep(SHARED_POLL_SECONDS)
+
+    async def _keep_alive(self, store_key: str, task: "asyncio.Task"):
+        while not task.done():
+            await asyncio.wait({task}, timeout=IDEMPOTENCY_LEASE / 3)
+            if not task.done():
+                self.shared.heartbeat(store_key)
+
+    def _finished(self, store_key: str, task: "asyncio.Task"):
+        failed = task.cancelled() or task.exception() is not None
+        if failed:
+            entry = self._entries.get(store_key)
+            if entry is not None and entry.task is task:
+                del self._entries[store_key]
+        if self.shared is None:
+            return
+        try:
+            if failed:
+                self.shared.release(store_key)
+            else:
+                self.shared.complete(store_key, json.dumps(jsonable_encoder(task.result())))
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"[IDEMPOTENCY] Could not share the result for {store_key}: {e}")
+            self.shared.release(store_key)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "keys": len(self._entries),
+            "in_flight": sum(1 for e in self._entries.values() if not e.task.done()),
+            "replays": self.replays,
+            "attached": self.attached,
+            "shared": self.shared is not None,
+        }
+
+
+idempotency_store = IdempotencyStore(SharedKeys() if IDEMPOTENCY_DB_PATH else None)
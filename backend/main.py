@@ -14,6 +14,7 @@ if __name__ == "__main__":
             "red_team": 0.1,
         },
         "agent_outputs": {},
+        "timings": {},
         "final_answer": "",
     }
 
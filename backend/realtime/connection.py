@@ -0,0 +1,169 @@
+"""
+Decoupled receive and processing loops for websocket sessions.
+
+A reader task keeps receiving from the socket while the handler processes
+messages, so frames are never left sitting in the client's send buffer
+while a transcription step or a decision runs. The reader validates and
+acknowledges audio frames itself (acks don't wait behind heavy work) and
+hands messages to the handler through a bounded queue.
+
+Backpressure is explicit: when the queue reaches its high-water mark the
+client gets {"type": "backpressure", "paused": true} and should hold off
+sending audio; {"paused": false} follows once the queue has drained to the
+low-water mark. If the client keeps sending and the queue fills up, the
+reader stops reading until there is room again.
+
+Heavy work awaited through guard() is cancelled as soon as the reader sees
+the client disconnect, rather than running to completion for nobody.
+"""
+
+import os
+import json
+import asyncio
+from typing import Any, Awaitable, Dict, Optional, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect
+from starlette.websockets import WebSocketState
+
+from realtime.protocol import AudioFrame, AudioStreamState, ProtocolError, receive_client_message
+
+WS_QUEUE_SIZE = int(os.getenv("SYNAPSE_WS_QUEUE_SIZE", "64"))
+
+Message = Tuple[Optional[AudioFrame], Optional[Dict[str, Any]]]
+
+
+class ClientConnection:
+    """Reader task + bounded queue in front of a websocket handler."""
+
+    def __init__(self, websocket: WebSocket, max_queue: int = WS_QUEUE_SIZE):
+        self.websocket = websocket
+        self.max_queue = max(1, max_queue)
+        self.high_water = max(1, self.max_queue * 3 // 4)
+        self.low_water = self.max_queue // 4
+        self.stream = AudioStreamState()
+        self.total_bytes = 0
+        self.paused = False
+        # Unbounded underneath so the end-of-stream marker always fits; the reader enforces max_queue
+        self._queue: "asyncio.Queue[Optional[Message]]" = asyncio.Queue()
+        self._room = asyncio.Event()
+        self._room.set()
+        self._send_lock = asyncio.Lock()
+        self._reader: Optional[asyncio.Task] = None
+        self._disconnect_code = 1000
+        # Unexpected reader failure, re-raised to the handler by receive()
+        self._error: Optional[BaseException] = None
+        self.disconnected = asyncio.Event()
+
+    def start(self):
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def send_json(self, data: Dict):
+        async with self._send_lock:
+            await self.websocket.send_json(data)
+
+    async def close(self, code: int = 1000, reason: Optional[str] = None):
+        async with self._send_lock:
+            await self.websocket.close(code=code, reason=reason)
+
+    async def _read_loop(self):
+        try:
+            while True:
+                try:
+                    frame, message = await receive_client_message(self.websocket)
+                except json.JSONDecodeError:
+                    await self.send_json({"type": "error", "message": "Invalid JSON format"})
+                    continue
+                except ProtocolError as e:
+                    await self.send_json({"type": "error", "message": f"Invalid message: {str(e)}"})
+                    continue
+
+                if frame is not None:
+                    try:
+                        warning = self.stream.accept(frame)
+                    except ProtocolError as e:
+                        await self.send_json({"type": "error", "message": f"Invalid audio frame: {str(e)}"})
+                        continue
+                    self.total_bytes += len(frame.payload)
+                    await self.send_json({
+                        "type": "ack",
+                        "seq": frame.seq,
+                        "bytes_received": len(frame.payload),
+                        "total_bytes": self.total_bytes,
+                    })
+                    if warning:
+                        await self.send_json({"type": "warning", "message": warning})
+                elif message.get("type") == "reset":
+                    # Frames after a reset belong to a new stream: reset before reading them
+                    self.stream.reset()
+                    self.total_bytes = 0
+
+                await self._put((frame, message))
+        except WebSocketDisconnect as e:
+            self._disconnect_code = e.code
+            self.disconnected.set()
+        except RuntimeError as e:
+            # Socket closed by the handler while we were reading
+            if self.websocket.application_state != WebSocketState.DISCONNECTED:
+                self._error = e
+        except Exception as e:
+            self._error = e
+        finally:
+            self._queue.put_nowait(None)
+
+    async def _put(self, item: Message):
+        if self._queue.qsize() >= self.high_water and not self.paused:
+            self.paused = True
+            await self.send_json({"type": "backpressure", "paused": True, "queued": self._queue.qsize()})
+        while self._queue.qsize() >= self.max_queue:
+            self._room.clear()
+            await self._room.wait()
+        self._queue.put_nowait(item)
+
+    async def receive(self) -> Message:
+        """
+        Next message for the handler, in arrival order.
+        Raises WebSocketDisconnect once the client is gone and the queue is
+        drained, or the reader's exception if it failed.
+        """
+        item = await self._queue.get()
+        if item is None:
+            # Keep the marker for any later call
+            self._queue.put_nowait(None)
+            if self._error is not None:
+                raise self._error
+            raise WebSocketDisconnect(self._disconnect_code)
+        if self._queue.qsize() < self.max_queue:
+            self._room.set()
+        if self.paused and self._queue.qsize() <= self.low_water:
+            self.paused = False
+            await self.send_json({"type": "backpressure", "paused": False, "queued": self._queue.qsize()})
+        return item
+
+    async def guard(self, work: Awaitable):
+        """
+        Await `work`, cancelling it and raising WebSocketDisconnect if the
+        client disconnects first.
+        """
+        task = asyncio.ensure_future(work)
+        watcher = asyncio.ensure_future(self.disconnected.wait())
+        try:
+            await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                raise WebSocketDisconnect(self._disconnect_code)
+            return task.result()
+        finally:
+            watcher.cancel()
+            if not task.done():
+                task.cancel()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    async def shutdown(self):
+        """Stop the reader (the handler is done with the connection)."""
+        if self._reader is not None and not self._reader.done():
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
@@ -0,0 +1,132 @@
+"""
+Websocket wire protocol for live audio.
+
+Audio travels in binary frames: an 8-byte big-endian header followed by the
+raw audio payload. JSON text frames carry control messages only. The legacy
+JSON `{"type": "audio", "data": <base64>}` message is still accepted.
+
+Binary frame header (struct ">BBHI"):
+    version      uint8   protocol version (1)
+    codec        uint8   0 = container (WebM/Ogg/MP4/...), 1 = pcm_s16le, 2 = f32le
+    sample_rate  uint16  sample rate in Hz for raw PCM (ignored for containers)
+    seq          uint32  frame sequence number, starting at 0
+"""
+
+import json
+import base64
+import struct
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+PROTOCOL_VERSION = 1
+HEADER = struct.Struct(">BBHI")
+
+CODEC_CONTAINER = 0
+CODEC_PCM_S16LE = 1
+CODEC_F32LE = 2
+
+# Codec id -> audio_format understood by the decoder (None = let ffmpeg probe it)
+CODEC_FORMATS = {
+    CODEC_CONTAINER: None,
+    CODEC_PCM_S16LE: "pcm_s16le",
+    CODEC_F32LE: "f32le",
+}
+
+
+class ProtocolError(Exception):
+    """Raised for malformed binary frames and malformed control messages."""
+
+
+class AudioFrame(NamedTuple):
+    audio_format: Optional[str]
+    sample_rate: int
+    seq: Optional[int]
+    payload: bytes
+
+
+def pack_frame(payload: bytes, seq: int, codec: int = CODEC_CONTAINER, sample_rate: int = 16000) -> bytes:
+    """Build a binary audio frame (used by clients and tests)."""
+    return HEADER.pack(PROTOCOL_VERSION, codec, sample_rate, seq) + payload
+
+
+def parse_frame(data: bytes) -> AudioFrame:
+    if len(data) < HEADER.size:
+        raise ProtocolError(f"Binary frame shorter than {HEADER.size}-byte header")
+    version, codec, sample_rate, seq = HEADER.unpack_from(data)
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Unsupported protocol version {version}")
+    if codec not in CODEC_FORMATS:
+        raise ProtocolError(f"Unknown codec id {codec}")
+    return AudioFrame(CODEC_FORMATS[codec], sample_rate or 16000, seq, data[HEADER.size:])
+
+
+async def receive_client_message(websocket: WebSocket) -> Tuple[Optional[AudioFrame], Optional[Dict[str, Any]]]:
+    """
+    Receive one client message.
+
+    Returns (frame, message): binary frames give (frame, None), control
+    messages give (None, message), and legacy base64 audio gives both so
+    the caller can read per-chunk fields such as `language`.
+    Raises json.JSONDecodeError for text frames that aren't JSON and
+    ProtocolError for malformed binary frames or messages (not an object,
+    bad base64 audio, non-numeric sample rate).
+    """
+    raw = await websocket.receive()
+    if raw["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(raw.get("code", 1000))
+
+    if raw.get("bytes") is not None:
+        return parse_frame(raw["bytes"]), None
+
+    message = json.loads(raw.get("text") or "")
+    if not isinstance(message, dict):
+        raise ProtocolError("Control messages must be JSON objects")
+    if message.get("type") == "audio":
+        audio_format = message.get("format")
+        if audio_format not in CODEC_FORMATS.values():
+            audio_format = None
+        try:
+            frame = AudioFrame(
+                audio_format,
+                int(message.get("sample_rate", 16000)),
+                message.get("seq"),
+                base64.b64decode(message.get("data", "")),
+            )
+        except (ValueError, TypeError, AttributeError) as e:
+            # binascii.Error (bad base64) is a ValueError
+            raise ProtocolError(f"Malformed audio message: {e}")
+        return frame, message
+    return None, message
+
+
+class AudioStreamState:
+    """Tracks format consistency and sequence numbers for one connection's audio."""
+
+    def __init__(self):
+        self.audio_format: Optional[str] = None
+        self.sample_rate: int = 16000
+        self.next_seq: Optional[int] = None
+        self.has_audio = False
+
+    def accept(self, frame: AudioFrame) -> Optional[str]:
+        """
+        Record a frame. Returns a warning for sequence gaps; raises
+        ProtocolError if the codec changes mid-stream.
+        """
+        if self.has_audio and (frame.audio_format, frame.sample_rate) != (self.audio_format, self.sample_rate):
+            raise ProtocolError("Codec or sample rate changed mid-stream; send END/transcribe first")
+        self.audio_format = frame.audio_format
+        self.sample_rate = frame.sample_rate
+        self.has_audio = True
+
+        warning = None
+        if frame.seq is not None:
+            if self.next_seq is not None and frame.seq != self.next_seq:
+                warning = f"Expected frame {self.next_seq}, got {frame.seq}"
+            self.next_seq = frame.seq + 1
+        return warning
+
+    def reset(self):
+        """Start a new utterance (sequence numbers continue)."""
+        self.has_audio = False
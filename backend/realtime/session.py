@@ -0,0 +1,85 @@
+"""
+Overlapped transcription for live sessions that end in a decision.
+
+While audio streams in, incremental transcription steps run in the
+background - one at a time, whenever enough new audio has arrived or the
+speaker pauses - so by the time the client asks for a decision only the
+tail of the recording is left to decode. Partial results are picked up by
+the connection handler between frames.
+"""
+
+import os
+import re
+import asyncio
+import difflib
+from typing import Dict, Optional
+
+from transcription.executor import TranscriptionOverloaded
+
+# New audio that triggers a background step even without a pause
+STEP_SECONDS = float(os.getenv("SYNAPSE_OVERLAP_STEP_SECONDS", "3"))
+# Minimum similarity for a speculative decision to stand for the final transcript
+SPECULATIVE_MIN_SIMILARITY = float(os.getenv("SYNAPSE_SPECULATIVE_SIMILARITY", "0.9"))
+
+
+def transcript_similarity(a: str, b: str) -> float:
+    """Word-level similarity ratio (0-1), ignoring case and punctuation."""
+    def words(text: str):
+        return re.sub(r"[^\w\s']", " ", text.lower()).split()
+    return difflib.SequenceMatcher(None, words(a), words(b), autojunk=False).ratio()
+
+
+class IncrementalTranscription:
+    """Feeds a streaming transcriber and runs its steps in the background."""
+
+    def __init__(self, audio, transcriber, step_seconds: float = STEP_SECONDS):
+        self.audio = audio
+        self.transcriber = transcriber
+        self.step_seconds = step_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._pause_pending = False
+        self._partial: Optional[Dict] = None
+        self.steps = 0
+
+    def feed(self, payload: bytes) -> bool:
+        """Add audio; returns True at the end of an utterance."""
+        self.transcriber.feed(payload)
+        ended = self.transcriber.poll_utterance_end()
+        if ended:
+            self._pause_pending = True
+        if ended or self.transcriber.pending_seconds() >= self.step_seconds:
+            self._start_step()
+        return ended
+
+    def _start_step(self):
+        if self._task is not None and not self._task.done():
+            return
+        after_pause, self._pause_pending = self._pause_pending, False
+        self._task = asyncio.create_task(self._step(after_pause))
+
+    async def _step(self, after_pause: bool):
+        try:
+            result = await self.audio.streaming_step_async(self.transcriber)
+        except TranscriptionOverloaded:
+            # Busy: this audio is picked up by a later step or at the end
+            self._pause_pending = self._pause_pending or after_pause
+            return
+        if not result.get("error"):
+            self.steps += 1
+            self._partial = {**result, "after_pause": after_pause}
+
+    def take_partial(self) -> Optional[Dict]:
+        """The newest background result not yet returned, if any."""
+        partial, self._partial = self._partial, None
+        return partial
+
+    async def finish(self) -> Dict:
+        """Wait for the running step, then decode and commit the remaining tail."""
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+        return await self.audio.streaming_step_async(self.transcriber, final=True)
+
+    def close(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self.transcriber.close()
@@ -0,0 +1,59 @@
+"""Shared on-disk transcription cache: one file, many connections and restarts."""
+
+import sqlite3
+import threading
+
+from transcription.disk_cache import DiskTranscriptionCache
+
+
+def test_entries_are_shared_across_threads_and_instances(tmp_path):
+    path = str(tmp_path / "transcripts.db")
+    writer = DiskTranscriptionCache(path)
+    writer.put("clip:en:base", "hello world", "en")
+
+    # A new thread opens its own connection (and runs the schema again)
+    seen = []
+    reader_thread = threading.Thread(target=lambda: seen.append(writer.get("clip:en:base")))
+    reader_thread.start()
+    reader_thread.join()
+    assert seen == [("hello world", "en")]
+
+    # Another worker / a restart on the same file
+    other = DiskTranscriptionCache(path)
+    assert other.get("clip:en:base") == ("hello world", "en")
+    other.put("clip:fr:base", "bonjour", "fr")
+    assert other.stats()["cached_items"] == 2
+
+
+def test_totals_survive_restarts_and_match_the_table(tmp_path):
+    path = str(tmp_path / "transcripts.db")
+    cache = DiskTranscriptionCache(path)
+    for i in range(10):
+        cache.put(f"clip{i}:en:base", "x" * 100, "en")
+    cache.put("clip0:en:base", "shorter", "en")
+
+    restarted = DiskTranscriptionCache(path)
+    restarted.put("clip10:en:base", "y" * 50, "en")
+    stats = restarted.stats()
+
+    count, total = sqlite3.connect(path).execute(
+        "SELECT COUNT(*), SUM(size) FROM transcripts"
+    ).fetchone()
+    assert stats["cached_items"] == count == 11
+    assert stats["cache_size_kb"] == round(total / 1024, 1)
+
+
+def test_totals_are_initialised_for_an_existing_database(tmp_path):
+    path = str(tmp_path / "transcripts.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE transcripts (key TEXT PRIMARY KEY, text TEXT NOT NULL, language TEXT, "
+        "size INTEGER NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO transcripts VALUES ('old:en:base', 'kept', 'en', 16, 1e12, 1e12)")
+    conn.commit()
+    conn.close()
+
+    cache = DiskTranscriptionCache(path)
+    assert cache.stats()["cached_items"] == 1
+    assert DiskTranscriptionCache(path).stats()["cached_items"] == 1
@@ -0,0 +1,52 @@
+"""Idempotency keys shared by workers through SQLite."""
+
+import asyncio
+
+import pytest
+
+from idempotency import IdempotencyStore, SharedKeys
+
+
+def _workers(tmp_path, count=2):
+    path = str(tmp_path / "idempotency.db")
+    return [IdempotencyStore(SharedKeys(path)) for _ in range(count)]
+
+
+def test_retry_on_another_worker_waits_for_and_replays_the_result(tmp_path):
+    first, second = _workers(tmp_path)
+    calls = []
+
+    async def work(tag):
+        calls.append(tag)
+        await asyncio.sleep(0.3)
+        return {"answer": tag}
+
+    async def scenario():
+        concurrent = await asyncio.gather(
+            first.run("decision", "key", "fp", lambda: work("first")),
+            second.run("decision", "key", "fp", lambda: work("second")),
+        )
+        later = await second.run("decision", "key", "fp", lambda: work("later"))
+        return concurrent, later
+
+    concurrent, later = asyncio.run(scenario())
+    assert calls == ["first"]
+    assert concurrent == [({"answer": "first"}, False), ({"answer": "first"}, True)]
+    assert later == ({"answer": "first"}, True)
+
+
+def test_failed_execution_releases_the_key(tmp_path):
+    first, second = _workers(tmp_path)
+
+    async def fail():
+        raise RuntimeError("upstream error")
+
+    async def succeed():
+        return {"answer": "retried"}
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await first.run("decision", "key", "fp", fail)
+        return await second.run("decision", "key", "fp", succeed)
+
+    assert asyncio.run(scenario()) == ({"answer": "retried"}, False)
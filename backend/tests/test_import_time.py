@@ -0,0 +1,46 @@
+"""
+Startup budget: importing the API must not pull in the transcription stack.
+
+whisper/torch (and audio_processor, which wires them up) are loaded on the
+first audio request or by the warm-up task, never at import time.
+"""
+
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+
+# Generous wall-clock budget for `import api`, to catch eager heavy imports
+IMPORT_BUDGET_SECONDS = float(os.getenv("SYNAPSE_IMPORT_BUDGET_SECONDS", "10"))
+HEAVY_MODULES = ("whisper", "torch", "faster_whisper", "audio_processor")
+
+_PROBE = """
+import sys, json, time
+started = time.perf_counter()
+import api
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def _import_api() -> dict:
+    env = {**os.environ, "PYTHONPATH": str(backend_dir)}
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=backend_dir, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_api_import_is_lazy_and_fast():
+    result = _import_api()
+    assert result["loaded"] == [], f"imported at startup: {result['loaded']}"
+    assert result["seconds"] < IMPORT_BUDGET_SECONDS, (
+        f"import api took {result['seconds']:.2f}s (budget {IMPORT_BUDGET_SECONDS:g}s)"
+    )
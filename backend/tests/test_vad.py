@@ -0,0 +1,33 @@
+"""Energy VAD: speech must be found with or without silence around it."""
+
+import numpy as np
+
+from transcription.decoding import SAMPLE_RATE
+from transcription.vad import detect_speech
+
+
+def _voiced(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    # 150 Hz buzz with harmonics, amplitude-modulated like syllables
+    tone = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6))
+    envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)
+    return (0.1 * tone * envelope).astype(np.float32)
+
+
+def test_clip_without_silence_is_speech():
+    assert detect_speech(_voiced(0.6))
+
+
+def test_speech_between_pauses_is_found():
+    silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    audio = np.concatenate([silence, _voiced(1.0), silence])
+    segments = detect_speech(audio)
+    assert len(segments) == 1
+    start, end = segments[0]
+    assert 0.7 * SAMPLE_RATE < start < SAMPLE_RATE < 2 * SAMPLE_RATE < end < 2.3 * SAMPLE_RATE
+
+
+def test_silence_and_low_noise_are_not_speech():
+    assert detect_speech(np.zeros(SAMPLE_RATE, dtype=np.float32)) == []
+    noise = np.random.default_rng(0).normal(0, 1e-4, SAMPLE_RATE).astype(np.float32)
+    assert detect_speech(noise) == []
@@ -0,0 +1,160 @@
+"""
+Micro-batched Whisper inference for short clips.
+
+Clips of up to 30 s that arrive within a few milliseconds of each other are
+padded to Whisper's fixed 30 s log-mel window, stacked, and decoded in one
+batched encoder/decoder pass instead of one `model.transcribe` call each.
+Each caller blocks on its own future and gets its own result back.
+
+Batched decoding is greedy without temperature fallback, so results that
+look like decoding failures (repetitive or low-confidence text) are flagged
+and the caller re-runs those clips through `model.transcribe`.
+
+Off by default (SYNAPSE_WHISPER_BATCHING): one batched pass replaces several
+parallel inferences, which only pays off where the hardware batches well -
+measure with benchmarks.batching_benchmark first. A clip with no other
+transcription job in flight is decoded at once instead of waiting the window.
+"""
+
+import os
+import time
+import queue
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from transcription.decoding import SAMPLE_RATE
+from transcription.executor import MAX_BATCH_SIZE, WHISPER_BATCHING, transcription_executor
+from transcription.registry import ModelKey, model_registry
+
+BATCH_WINDOW_MS = float(os.getenv("SYNAPSE_WHISPER_BATCH_WINDOW_MS", "10"))
+# Longest clip that fits in one Whisper window
+MAX_BATCH_SAMPLES = 30 * SAMPLE_RATE
+
+# Same thresholds whisper.transcribe uses to trigger temperature fallback
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+
+
+class _Request(NamedTuple):
+    model_key: ModelKey
+    language: Optional[str]
+    audio: np.ndarray
+    future: Future
+
+
+class BatchScheduler:
+    """Collects concurrent short-clip requests and decodes them in batches."""
+
+    def __init__(self, window_ms: float = BATCH_WINDOW_MS, max_batch: int = MAX_BATCH_SIZE,
+                 batching: bool = WHISPER_BATCHING, executor=transcription_executor):
+        self.batching = batching
+        # Executor whose jobs feed this scheduler, to tell whether more clips can arrive
+        self.executor = executor
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.clips = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.batching and self.window > 0 and self.max_batch > 1
+
+    def transcribe(self, model_key: ModelKey, audio: np.ndarray, language: Optional[str] = None) -> Dict:
+        """Blocking: queue a clip for the next batch and wait for its result."""
+        if len(audio) > MAX_BATCH_SAMPLES:
+            raise ValueError("Clip longer than 30 s can't be batched")
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put(_Request(model_key, language, audio, future))
+        return future.result()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="whisper-batcher", daemon=True)
+                    self._thread.start()
+
+    def _collect(self) -> List[_Request]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            if self._queue.empty() and self.executor.in_flight <= len(batch):
+                # Nothing else is being transcribed: no clip can join this batch
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            groups: Dict[tuple, List[_Request]] = defaultdict(list)
+            for request in batch:
+                groups[(request.model_key, request.language)].append(request)
+            for (model_key, language), requests in groups.items():
+                try:
+                    results = self._decode(model_key, language, [r.audio for r in requests])
+                    for request, result in zip(requests, results):
+                        request.future.set_result(result)
+                except Exception as e:
+                    for request in requests:
+                        request.future.set_exception(e)
+
+    def _decode(self, model_key: ModelKey, language: Optional[str], clips: List[np.ndarray]) -> List[Dict]:
+        import torch
+        import whisper
+
+        model = model_registry.get_by_key(model_key)
+        fp16 = model_key.precision == "fp16"
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(clip), n_mels=model.dims.n_mels)
+            for clip in clips
+        ]).to(model.device)
+        if fp16:
+            mel = mel.half()
+
+        options = whisper.DecodingOptions(language=language, fp16=fp16, without_timestamps=True)
+        with torch.no_grad():
+            decoded = whisper.decode(model, mel, options)
+
+        self.batches += 1
+        self.clips += len(clips)
+        if len(clips) > 1:
+            print(f"[BATCH] Decoded {len(clips)} clips in one pass ({model_key})")
+        return [
+            {
+                "text": result.text.strip(),
+                "language": result.language,
+                "needs_fallback": (
+                    result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                    or result.avg_logprob < LOGPROB_THRESHOLD
+                ),
+            }
+            for result in decoded
+        ]
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "batches": self.batches,
+            "clips": self.clips,
+            "avg_batch_size": round(self.clips / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+batch_scheduler = BatchScheduler()
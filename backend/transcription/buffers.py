@@ -0,0 +1,103 @@
+"""
+Bounded, incrementally hashed audio buffers.
+
+Uploaded and streamed audio is written chunk by chunk into a spooled
+temporary file: it stays in memory up to SPOOL_BYTES and moves to disk past
+that, so a large upload or a long-lived session costs disk rather than
+worker memory. Anything beyond MAX_AUDIO_BYTES is rejected. The content hash
+used as the transcription cache key (BLAKE2b) is updated per chunk instead
+of over the whole buffer at the end, and view() hands the bytes to the
+decoder without copying them (a memoryview of the in-memory buffer, or of
+an mmap of the spilled file).
+"""
+
+import os
+import mmap
+import hashlib
+import tempfile
+from typing import Optional
+
+MAX_AUDIO_BYTES = int(float(os.getenv("SYNAPSE_MAX_AUDIO_MB", "25")) * 1024 * 1024)
+# Per-connection cap for websocket sessions (audio received since the last reset/transcription)
+WS_MAX_AUDIO_BYTES = int(float(os.getenv("SYNAPSE_WS_MAX_AUDIO_MB", "50")) * 1024 * 1024)
+SPOOL_BYTES = int(float(os.getenv("SYNAPSE_AUDIO_SPOOL_MB", "2")) * 1024 * 1024)
+
+
+class AudioTooLarge(Exception):
+    """Raised when a buffer would grow past its byte cap."""
+
+
+def new_audio_hash(data: bytes = b"") -> "hashlib.blake2b":
+    return hashlib.blake2b(data, digest_size=16)
+
+
+class AudioBuffer:
+    """Append-only audio buffer with a byte cap, disk spill and a running hash."""
+
+    def __init__(self, max_bytes: int = MAX_AUDIO_BYTES, spool_bytes: int = SPOOL_BYTES):
+        self.max_bytes = max_bytes
+        self.spool_bytes = spool_bytes
+        self._file = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+        self._hash = new_audio_hash()
+        self._view: Optional[memoryview] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self.size = 0
+
+    def write(self, chunk: bytes):
+        if self.size + len(chunk) > self.max_bytes:
+            raise AudioTooLarge(f"Audio exceeds {self.max_bytes / (1024 * 1024):g} MB limit")
+        self._release_view()
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    @property
+    def digest(self) -> str:
+        return self._hash.hexdigest()
+
+    @property
+    def spilled(self) -> bool:
+        return self._file._rolled
+
+    def view(self) -> memoryview:
+        """
+        Zero-copy read-only view of the contents. Valid until the next write,
+        reset() or close(); don't write while a consumer still reads it.
+        """
+        if self._view is None:
+            if self.size == 0:
+                self._view = memoryview(b"")
+            elif self.spilled:
+                self._file.flush()
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._mmap)
+            else:
+                self._view = self._file._file.getbuffer().toreadonly()
+        return self._view
+
+    def _release_view(self):
+        if self._view is None:
+            return
+        try:
+            self._view.release()
+            if self._mmap is not None:
+                self._mmap.close()
+        except BufferError:
+            # A consumer still holds a slice; the mapping is freed once it lets go
+            pass
+        self._view = None
+        self._mmap = None
+
+    def reset(self):
+        """Drop the contents and start a new hash (e.g. between utterances)."""
+        self.close()
+        self._file = tempfile.SpooledTemporaryFile(max_size=self.spool_bytes)
+        self._hash = new_audio_hash()
+        self.size = 0
+
+    def close(self):
+        self._release_view()
+        try:
+            self._file.close()
+        except BufferError:
+            pass
@@ -0,0 +1,104 @@
+"""
+Bounded in-memory transcription cache.
+
+LRU with a byte budget and a TTL. Entry sizes are computed once on insert,
+so size accounting and stats are O(1). Keys include the language and model
+size, since a 'tiny' transcript is not a valid answer to a 'small' request.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+TRANSCRIPTION_CACHE_MB = float(os.getenv("SYNAPSE_TRANSCRIPTION_CACHE_MB", "64"))
+TRANSCRIPTION_CACHE_TTL = float(os.getenv("SYNAPSE_TRANSCRIPTION_CACHE_TTL", "86400"))
+
+# Rough per-entry overhead (key, tuple, OrderedDict node) added to the text size
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class CachedTranscription(NamedTuple):
+    text: str
+    language: Optional[str]
+    size: int
+    expires_at: float
+
+
+def make_cache_key(audio_hash: str, language: Optional[str], model_size: str) -> str:
+    return f"{audio_hash}:{language or 'auto'}:{model_size}"
+
+
+class TranscriptionCache:
+    """Thread-safe byte-budgeted LRU with TTL and hit/miss/eviction counters."""
+
+    def __init__(self, max_mb: float = TRANSCRIPTION_CACHE_MB, ttl_seconds: float = TRANSCRIPTION_CACHE_TTL):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedTranscription]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[CachedTranscription]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, text: str, language: Optional[str]):
+        size = len(key) + len(text.encode("utf-8")) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CachedTranscription(text, language, size, time.monotonic() + self.ttl_seconds)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str):
+        self._bytes -= self._entries.pop(key).size
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cached_items": len(self._entries),
+                "cache_size_kb": round(self._bytes / 1024, 1),
+                "max_size_kb": round(self.max_bytes / 1024, 1),
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,288 @@
+"""
+Parallel chunked transcription for long recordings.
+
+Long audio is split at pauses (vad.split_on_pauses) into chunks of at most
+CHUNK_SECONDS, and the chunks are transcribed concurrently on a process pool
+- one model per worker process, so chunks don't contend for the GIL or a
+single model. Segment timestamps are shifted back onto the original
+timeline, and chunk texts are joined with consistent sentence punctuation.
+
+Workers are spawned (not forked) so they don't inherit the server's threads,
+and each caps torch's intra-op threads so the pool uses the cores once.
+"""
+
+import os
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from transcription.decoding import SAMPLE_RATE
+from transcription.executor import CPU_COUNT, TranscriptionCancelled
+from transcription.vad import Segment, split_on_pauses
+
+CHUNK_PROCESSES = int(os.getenv("SYNAPSE_CHUNK_PROCESSES", str(max(1, min(4, CPU_COUNT // 2)))))
+CHUNK_SECONDS = float(os.getenv("SYNAPSE_CHUNK_SECONDS", "30"))
+# Smaller chunks for streaming responses, so the first text arrives quickly
+STREAM_CHUNK_SECONDS = float(os.getenv("SYNAPSE_STREAM_CHUNK_SECONDS", "10"))
+# Recordings shorter than this are transcribed in one pass
+CHUNKED_MIN_SECONDS = float(os.getenv("SYNAPSE_CHUNKED_MIN_SECONDS", "90"))
+# How often a waiting transcription checks whether its caller went away
+STOP_POLL_SECONDS = 0.25
+
+_SENTENCE_END = re.compile(r"[.!?…]['\")\]]*$")
+
+
+def _init_worker(torch_threads: int):
+    import torch
+    torch.set_num_threads(torch_threads)
+
+
+def _transcribe_chunk(
+    engine_name: str,
+    model_size: str,
+    language: Optional[str],
+    audio: np.ndarray,
+    options: Optional[Dict] = None,
+) -> Dict:
+    """
+    Runs in a worker process; the engine's registry caches the model per process.
+    `options` are decoding options (e.g. a policy profile's), defaulting to
+    full temperature fallback.
+    """
+    from transcription.engines import get_engine
+
+    result = get_engine(engine_name).transcribe(
+        audio,
+        language=language,
+        model_size=model_size,
+        **(options or {"temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)}),
+    )
+    return {
+        "text": result["text"].strip(),
+        "language": result.get("language"),
+        "segments": [
+            {"start": s["start"], "end": s["end"], "text": s["text"].strip()}
+            for s in result.get("segments", [])
+        ],
+    }
+
+
+def _shift_segments(segments: List[Dict], bound: Segment) -> List[Dict]:
+    """Move chunk-relative segment times onto the recording's timeline."""
+    offset, limit = bound[0] / SAMPLE_RATE, bound[1] / SAMPLE_RATE
+    return [
+        {
+            "start": round(min(offset + s["start"], limit), 2),
+            "end": round(min(offset + s["end"], limit), 2),
+            "text": s["text"],
+        }
+        for s in segments
+    ]
+
+
+def stitch_texts(texts: List[str]) -> str:
+    """
+    Join chunk transcripts. Chunks are cut at pauses, so a chunk that ends
+    without sentence punctuation followed by one starting with a capital is
+    treated as a sentence break; a lowercase start continues the sentence.
+    """
+    parts: List[str] = []
+    for text in texts:
+        text = text.strip()
+        if not text:
+            continue
+        if parts and not _SENTENCE_END.search(parts[-1]) and text[0].isupper():
+            parts[-1] = parts[-1].rstrip(",;:-") + "."
+        parts.append(text)
+    joined = " ".join(parts)
+    # Whitespace before punctuation left by chunk boundaries
+    return re.sub(r"\s+([,.!?;:])", r"\1", joined)
+
+
+class ChunkedTranscriber:
+    """Splits long audio on pauses and transcribes the chunks on a process pool."""
+
+    def __init__(self, processes: int = CHUNK_PROCESSES, chunk_seconds: float = CHUNK_SECONDS):
+        self.processes = processes
+        self.chunk_seconds = chunk_seconds
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self.recordings = 0
+        self.chunks = 0
+        self.relabelled = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.processes > 1
+
+    def should_chunk(self, audio: np.ndarray) -> bool:
+        return self.enabled and len(audio) >= CHUNKED_MIN_SECONDS * SAMPLE_RATE
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(max(1, CPU_COUNT // self.processes),),
+                )
+            return self._pool
+
+    def _run(
+        self,
+        engine_name: str,
+        model_size: str,
+        jobs: List[tuple],
+        stop: Optional[threading.Event] = None,
+        options: Optional[Dict] = None,
+    ) -> List[Dict]:
+        pool = self._get_pool()
+        futures = []
+        try:
+            futures = [
+                pool.submit(_transcribe_chunk, engine_name, model_size, language, audio, options)
+                for language, audio in jobs
+            ]
+            pending = set(futures)
+            while pending:
+                if stop is not None and stop.is_set():
+                    raise TranscriptionCancelled("Chunked transcription cancelled")
+                _, pending = wait(pending, timeout=STOP_POLL_SECONDS)
+            return [f.result() for f in futures]
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            raise
+        finally:
+            # No-op for finished chunks; drops queued ones after a failure or cancellation
+            for future in futures:
+                future.cancel()
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        # A worker died (e.g. out of memory); start a fresh pool next time
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+
+    def transcribe(
+        self,
+        audio: np.ndarray,
+        language: Optional[str],
+        engine_name: str,
+        model_size: str,
+        speech: Optional[List[Segment]] = None,
+        stop: Optional[threading.Event] = None,
+        options: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        Blocking: transcribe `audio` chunk by chunk in parallel. Setting
+        `stop` cancels the chunks not yet running (TranscriptionCancelled).
+        `options` are passed to every chunk's decode.
+
+        Returns:
+            Dict with 'text', 'language', 'segments' (timestamps in seconds on
+            the original timeline) and 'chunks'
+        """
+        bounds = split_on_pauses(audio, self.chunk_seconds, speech)
+        clips = [audio[start:end] for start, end in bounds]
+        print(f"[CHUNKED] {len(audio) / SAMPLE_RATE:.0f}s split into {len(clips)} chunks on {self.processes} processes")
+        results = self._run(engine_name, model_size, [(language, clip) for clip in clips], stop, options)
+
+        if language is None and results:
+            # Auto-detect per chunk, then redo chunks that disagree with the majority
+            language = Counter(r["language"] for r in results).most_common(1)[0][0]
+            outliers = [i for i, r in enumerate(results) if r["language"] != language]
+            if outliers:
+                redone = self._run(engine_name, model_size, [(language, clips[i]) for i in outliers], stop, options)
+                for i, result in zip(outliers, redone):
+                    results[i] = result
+                self.relabelled += len(outliers)
+
+        segments = []
+        for bound, result in zip(bounds, results):
+            segments.extend(_shift_segments(result["segments"], bound))
+
+        self.recordings += 1
+        self.chunks += len(clips)
+        return {
+            "text": stitch_texts([r["text"] for r in results]),
+            "language": language,
+            "segments": segments,
+            "chunks": len(clips),
+        }
+
+    def iter_transcribe(
+        self,
+        audio: np.ndarray,
+        language: Optional[str],
+        engine_name: str,
+        model_size: str,
+        chunk_seconds: float,
+        speech: Optional[List[Segment]] = None,
+        stop: Optional[threading.Event] = None,
+        options: Optional[Dict] = None,
+    ) -> Iterator[Dict]:
+        """
+        Blocking generator: yield each chunk's result in order as soon as it
+        is ready, for streaming responses. The first chunk runs alone (it
+        also fixes the language for the rest); the remaining chunks run in
+        parallel on the pool when it is enabled. Setting `stop` cancels
+        chunks that haven't started.
+        """
+        bounds = split_on_pauses(audio, chunk_seconds, speech)
+        if not bounds:
+            return
+        head, *rest = bounds
+
+        result = _transcribe_chunk(engine_name, model_size, language, audio[head[0]:head[1]], options)
+        language = language or result["language"]
+        yield {**result, "language": language, "segments": _shift_segments(result["segments"], head)}
+
+        pool = None
+        if self.enabled and rest:
+            pool = self._get_pool()
+            pending = [
+                (bound, pool.submit(
+                    _transcribe_chunk, engine_name, model_size, language, audio[bound[0]:bound[1]], options
+                ))
+                for bound in rest
+            ]
+        else:
+            pending = [(bound, None) for bound in rest]
+
+        try:
+            for bound, future in pending:
+                if stop is not None and stop.is_set():
+                    return
+                if future is None:
+                    result = _transcribe_chunk(engine_name, model_size, language, audio[bound[0]:bound[1]], options)
+                else:
+                    result = future.result()
+                yield {**result, "language": language, "segments": _shift_segments(result["segments"], bound)}
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            raise
+        finally:
+            for _, future in pending:
+                if future is not None:
+                    future.cancel()
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "processes": self.processes,
+            "chunk_seconds": self.chunk_seconds,
+            "min_seconds": CHUNKED_MIN_SECONDS,
+            "recordings": self.recordings,
+            "chunks": self.chunks,
+            "relabelled_chunks": self.relabelled,
+        }
+
+
+chunked_transcriber = ChunkedTranscriber()
@@ -0,0 +1,240 @@
+"""
+Audio decoding to Whisper's input format (mono float32 at 16 kHz), in memory.
+
+WAV and raw PCM are decoded directly with NumPy, without spawning a process.
+Everything else is piped through ffmpeg's stdin/stdout, so clips never touch
+the disk (a temp file is only used as a fallback for containers ffmpeg can't
+read from a pipe, such as MP4 with the index at the end).
+"""
+
+import os
+import tempfile
+import threading
+import subprocess
+from math import gcd
+from typing import List, Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# Raw mono formats clients can declare explicitly
+RAW_FORMATS = ("pcm_s16le", "f32le")
+
+
+class AudioDecodeError(Exception):
+    """Raised when audio bytes can't be decoded."""
+
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    """Little-endian signed 16-bit PCM to float32 in [-1, 1]."""
+    usable = len(data) - (len(data) % 2)
+    return np.frombuffer(memoryview(data)[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+
+def _resample(audio: np.ndarray, rate: int) -> np.ndarray:
+    if rate == SAMPLE_RATE:
+        return audio
+    from scipy.signal import resample_poly
+    divisor = gcd(rate, SAMPLE_RATE)
+    return resample_poly(audio, SAMPLE_RATE // divisor, rate // divisor).astype(np.float32)
+
+
+def is_wav(data: bytes) -> bool:
+    return len(data) >= 12 and bytes(data[:4]) == b"RIFF" and bytes(data[8:12]) == b"WAVE"
+
+
+def _wav_chunks(data: bytes):
+    """Yield (chunk id, offset, size) for the RIFF chunks of a WAV file."""
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id = bytes(data[offset:offset + 4])
+        size = int.from_bytes(data[offset + 4:offset + 8], "little")
+        yield chunk_id, offset + 8, min(size, len(data) - offset - 8)
+        offset += 8 + size + (size & 1)
+
+
+def decode_wav(data: bytes) -> Optional[np.ndarray]:
+    """
+    Decode 16-bit PCM WAV with NumPy, reading the samples in place (works on
+    bytes, memoryviews and mmaps without copying the payload). Returns None
+    for WAV variants the fast path doesn't handle (float, 24-bit,
+    compressed), which go through ffmpeg.
+    """
+    fmt = None
+    for chunk_id, offset, size in _wav_chunks(data):
+        if chunk_id == b"fmt " and size >= 16:
+            header = bytes(data[offset:offset + 16])
+            fmt = (
+                int.from_bytes(header[0:2], "little"),   # format tag (1 = PCM)
+                int.from_bytes(header[2:4], "little"),   # channels
+                int.from_bytes(header[4:8], "little"),   # sample rate
+                int.from_bytes(header[14:16], "little"), # bits per sample
+            )
+        elif chunk_id == b"data" and fmt is not None:
+            tag, channels, rate, bits = fmt
+            if tag != 1 or bits != 16 or channels < 1:
+                return None
+            audio = pcm16_to_float32(data[offset:offset + size])
+            if channels > 1:
+                audio = audio[: len(audio) - len(audio) % channels].reshape(-1, channels).mean(axis=1)
+            return _resample(audio, rate)
+    return None
+
+
+def _ffmpeg_command(source: str) -> list:
+    return [
+        "ffmpeg", "-nostdin", "-threads", "0", "-loglevel", "error",
+        "-i", source,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE),
+        "pipe:1",
+    ]
+
+
+def decode_with_ffmpeg(data: bytes) -> np.ndarray:
+    """Decode any ffmpeg-supported container through a pipe (no temp file)."""
+    try:
+        result = subprocess.run(_ffmpeg_command("pipe:0"), input=data, capture_output=True, check=True)
+        return pcm16_to_float32(result.stdout)
+    except FileNotFoundError:
+        raise AudioDecodeError("ffmpeg not found; install ffmpeg to decode compressed audio")
+    except subprocess.CalledProcessError as pipe_error:
+        # Some containers need a seekable input; retry from a temp file
+        with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
+            tmp_file.write(data)
+            tmp_path = tmp_file.name
+        try:
+            result = subprocess.run(_ffmpeg_command(tmp_path), capture_output=True, check=True)
+            return pcm16_to_float32(result.stdout)
+        except subprocess.CalledProcessError:
+            raise AudioDecodeError(f"Failed to decode audio: {pipe_error.stderr.decode(errors='ignore').strip()}")
+        finally:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+def decode_audio(data: bytes, audio_format: Optional[str] = None, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode audio bytes to mono float32 at 16 kHz.
+
+    Args:
+        data: Encoded audio (WAV, WebM, MP3, ...) or raw PCM; any bytes-like
+            object, e.g. a zero-copy AudioBuffer view
+        audio_format: 'pcm_s16le' or 'f32le' for raw mono samples;
+            None to detect WAV or fall back to ffmpeg
+        sample_rate: Sample rate of raw PCM input (resampled to 16 kHz)
+    """
+    if audio_format == "pcm_s16le":
+        return _resample(pcm16_to_float32(data), sample_rate)
+    if audio_format == "f32le":
+        usable = len(data) - (len(data) % 4)
+        return _resample(np.frombuffer(memoryview(data)[:usable], dtype="<f4").copy(), sample_rate)
+    if is_wav(data):
+        audio = decode_wav(data)
+        if audio is not None:
+            return audio
+    return decode_with_ffmpeg(data)
+
+
+class StreamingDecoder:
+    """
+    Incrementally decode a stream of audio chunks to 16 kHz float32.
+
+    Raw PCM chunks are converted as they arrive. Containers (e.g. WebM from
+    MediaRecorder, where only the first chunk carries the header) are fed to
+    one long-lived ffmpeg process per stream, so each byte is decoded once.
+    """
+
+    def __init__(self, audio_format: Optional[str] = None, sample_rate: int = SAMPLE_RATE):
+        self.audio_format = audio_format
+        self.sample_rate = sample_rate
+        self._remainder = b""
+        self._decoded: List[np.ndarray] = []
+        self._pcm = bytearray()
+        self._lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+        self._reader: Optional[threading.Thread] = None
+
+    def feed(self, data: bytes):
+        if self.audio_format in RAW_FORMATS:
+            width = 2 if self.audio_format == "pcm_s16le" else 4
+            data = self._remainder + data
+            usable = len(data) - (len(data) % width)
+            self._remainder = data[usable:]
+            if usable:
+                self._decoded.append(decode_audio(data[:usable], self.audio_format, self.sample_rate))
+            return
+
+        if self._process is None:
+            self._start_ffmpeg()
+        try:
+            self._process.stdin.write(data)
+            self._process.stdin.flush()
+        except BrokenPipeError:
+            raise AudioDecodeError("Audio decoder exited; stream is not decodable")
+
+    def _start_ffmpeg(self):
+        command = _ffmpeg_command("pipe:0")
+        command[-1:-1] = ["-flush_packets", "1"]
+        try:
+            self._process = subprocess.Popen(
+                command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+        except FileNotFoundError:
+            raise AudioDecodeError("ffmpeg not found; install ffmpeg to decode compressed audio")
+        self._reader = threading.Thread(target=self._read_stdout, args=(self._process.stdout,), daemon=True)
+        self._reader.start()
+
+    def _read_stdout(self, stdout):
+        while True:
+            chunk = stdout.read1(65536)
+            if not chunk:
+                break
+            with self._lock:
+                self._pcm.extend(chunk)
+
+    def read(self) -> np.ndarray:
+        """Samples decoded since the previous call."""
+        if self._process is not None:
+            with self._lock:
+                usable = len(self._pcm) - (len(self._pcm) % 2)
+                data = self._pcm[:usable]
+                del self._pcm[:usable]
+            if data:
+                self._decoded.append(pcm16_to_float32(data))
+        if not self._decoded:
+            return np.zeros(0, dtype=np.float32)
+        audio = np.concatenate(self._decoded) if len(self._decoded) > 1 else self._decoded[0]
+        self._decoded = []
+        return audio
+
+    def close(self) -> np.ndarray:
+        """Flush the decoder and return the remaining samples."""
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+            except BrokenPipeError:
+                pass
+            self._process.wait()
+            self._reader.join()
+        audio = self.read()
+        self._process = None
+        return audio
+
+    def terminate(self):
+        """Stop the decoder without flushing, for a stream that was abandoned."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        process.kill()
+        process.wait()
+        self._reader.join()
+        for pipe in (process.stdin, process.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+        with self._lock:
+            self._pcm.clear()
@@ -0,0 +1,199 @@
+"""
+Persistent, content-addressed transcription cache shared by all workers on a host.
+
+Transcripts are stored in SQLite (WAL mode, memory-mapped reads) keyed by the
+same content hash + language + model key as the in-memory cache, so it
+survives restarts and every uvicorn worker sees every other worker's results.
+A background thread keeps the database under its size limit by evicting the
+least recently used entries and returning freed pages to the filesystem.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+backend_dir = Path(__file__).resolve().parent.parent
+
+DISK_CACHE_PATH = os.getenv("SYNAPSE_TRANSCRIPTION_DISK_CACHE", str(backend_dir / "data" / "transcripts.db"))
+DISK_CACHE_MB = float(os.getenv("SYNAPSE_TRANSCRIPTION_DISK_CACHE_MB", "512"))
+DISK_CACHE_TTL = float(os.getenv("SYNAPSE_TRANSCRIPTION_DISK_CACHE_TTL", str(30 * 86400)))
+COMPACTION_INTERVAL = float(os.getenv("SYNAPSE_TRANSCRIPTION_DISK_CACHE_COMPACT_SECONDS", "300"))
+MMAP_BYTES = 256 * 1024 * 1024
+# Only rewrite last_access if it is older than this, so hot reads don't turn into writes
+TOUCH_INTERVAL = 60.0
+# Least recently used entries read per eviction query
+EVICT_BATCH = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    language TEXT,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transcripts_last_access ON transcripts (last_access);
+
+-- Running totals kept by triggers in the writing transaction, so stats and
+-- compaction never scan the table
+CREATE TABLE IF NOT EXISTS transcript_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    items INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+-- Filled in once for databases created before the totals row existed
+INSERT OR IGNORE INTO transcript_totals (id, items, bytes)
+    SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM transcripts
+    HAVING NOT EXISTS (SELECT 1 FROM transcript_totals);
+CREATE TRIGGER IF NOT EXISTS transcripts_count_insert AFTER INSERT ON transcripts BEGIN
+    UPDATE transcript_totals SET items = items + 1, bytes = bytes + new.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS transcripts_count_delete AFTER DELETE ON transcripts BEGIN
+    UPDATE transcript_totals SET items = items - 1, bytes = bytes - old.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS transcripts_count_update AFTER UPDATE OF size ON transcripts BEGIN
+    UPDATE transcript_totals SET bytes = bytes - old.size + new.size WHERE id = 0;
+END;
+"""
+
+
+class DiskTranscriptionCache:
+    """SQLite-backed cache safe for concurrent use from threads and processes."""
+
+    def __init__(self, path: str = DISK_CACHE_PATH, max_mb: float = DISK_CACHE_MB, ttl_seconds: float = DISK_CACHE_TTL):
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._compactor: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            # auto_vacuum must be set before the first table is created
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        self._ensure_compactor()
+        return conn
+
+    def _ensure_compactor(self):
+        if self._compactor is None:
+            with self._start_lock:
+                if self._compactor is None:
+                    self._compactor = threading.Thread(target=self._compact_loop, name="transcript-cache-compactor", daemon=True)
+                    self._compactor.start()
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[str]]]:
+        """Return (text, language) or None."""
+        now = time.time()
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT text, language, last_access, created_at FROM transcripts WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[3] + self.ttl_seconds <= now:
+                self.misses += 1
+                return None
+            if row[2] < now - TOUCH_INTERVAL:
+                with conn:
+                    conn.execute("UPDATE transcripts SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0], row[1]
+        except sqlite3.Error as e:
+            print(f"[DISK CACHE ERROR] Read failed: {e}")
+            return None
+
+    def put(self, key: str, text: str, language: Optional[str]):
+        now = time.time()
+        size = len(key) + len(text.encode("utf-8"))
+        try:
+            conn = self._conn()
+            with conn:
+                # Upsert rather than REPLACE: REPLACE's implicit delete doesn't fire the totals trigger
+                conn.execute(
+                    "INSERT INTO transcripts (key, text, language, size, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                    "text = excluded.text, language = excluded.language, size = excluded.size, "
+                    "created_at = excluded.created_at, last_access = excluded.last_access",
+                    (key, text, language, size, now, now),
+                )
+        except sqlite3.Error as e:
+            print(f"[DISK CACHE ERROR] Write failed: {e}")
+
+    def clear(self):
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM transcripts")
+            conn.execute("PRAGMA incremental_vacuum")
+        except sqlite3.Error as e:
+            print(f"[DISK CACHE ERROR] Clear failed: {e}")
+
+    def compact(self):
+        """Drop expired entries, evict LRU entries over the size limit, release free pages."""
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM transcripts WHERE created_at <= ?", (time.time() - self.ttl_seconds,))
+            total = self._totals(conn)[1]
+            if total > self.max_bytes:
+                # Evict down to 90% so compaction doesn't run on every insert at the limit
+                excess = total - int(self.max_bytes * 0.9)
+                while excess > 0:
+                    rows = conn.execute(
+                        "SELECT key, size FROM transcripts ORDER BY last_access LIMIT ?", (EVICT_BATCH,)
+                    ).fetchall()
+                    if not rows:
+                        break
+                    doomed = []
+                    for key, size in rows:
+                        if excess <= 0:
+                            break
+                        doomed.append((key,))
+                        excess -= size
+                    conn.executemany("DELETE FROM transcripts WHERE key = ?", doomed)
+                    self.evictions += len(doomed)
+        conn.execute("PRAGMA incremental_vacuum")
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def _compact_loop(self):
+        while True:
+            time.sleep(COMPACTION_INTERVAL)
+            try:
+                self.compact()
+            except sqlite3.Error as e:
+                print(f"[DISK CACHE ERROR] Compaction failed: {e}")
+
+    @staticmethod
+    def _totals(conn: sqlite3.Connection) -> Tuple[int, int]:
+        """(items, bytes) from the trigger-maintained totals row."""
+        return conn.execute("SELECT items, bytes FROM transcript_totals WHERE id = 0").fetchone()
+
+    def stats(self) -> Dict:
+        try:
+            count, total = self._totals(self._conn())
+        except sqlite3.Error:
+            count, total = None, None
+        return {
+            "path": self.path,
+            "cached_items": count,
+            "cache_size_kb": round(total / 1024, 1) if total is not None else None,
+            "max_size_kb": round(self.max_bytes / 1024, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,173 @@
+"""
+Pluggable transcription engines.
+
+Every engine takes 16 kHz mono float32 audio and returns a whisper-style
+result dict: 'text', 'language' and 'segments' (each with 'start', 'end',
+'text' and, when word timestamps are requested, 'words'). Models are loaded
+through the shared model registry, so they count against the same memory
+budget and are evicted the same way.
+
+Engines (SYNAPSE_TRANSCRIPTION_ENGINE):
+- whisper: openai-whisper in fp32 (fp16 on CUDA) - the reference backend
+- whisper-int8: openai-whisper with its Linear layers dynamically quantized
+  to int8, always on CPU
+- faster-whisper: CTranslate2 int8 inference (optional `faster-whisper` package)
+"""
+
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from transcription.executor import TORCH_THREADS
+from transcription.registry import ModelKey, model_registry
+
+TRANSCRIPTION_ENGINE = os.getenv("SYNAPSE_TRANSCRIPTION_ENGINE", "whisper")
+CT2_COMPUTE_TYPE = os.getenv("SYNAPSE_CT2_COMPUTE_TYPE", "int8")
+
+
+class TranscriptionEngine:
+    """Interface for a transcription backend."""
+
+    name = "engine"
+    # Whether batching.BatchScheduler can decode this engine's models
+    supports_batching = False
+
+    def model_key(self, model_size: str) -> ModelKey:
+        raise NotImplementedError
+
+    def load(self, model_size: str):
+        return model_registry.get_by_key(self.model_key(model_size))
+
+    def label(self, model_size: str) -> str:
+        """Model label for cache keys and results; transcripts differ between engines."""
+        return f"{model_size}/{self.name}"
+
+    def transcribe(self, audio: np.ndarray, language: Optional[str] = None, model_size: str = "base", **options) -> Dict:
+        """
+        Transcribe decoded audio.
+
+        Options follow whisper.transcribe: temperature, word_timestamps,
+        condition_on_previous_text, initial_prompt, beam_size.
+        """
+        raise NotImplementedError
+
+    def detect_language(self, audio: np.ndarray, model_size: str = "base") -> Tuple[str, float]:
+        """Most likely language of the first 30 s and its probability (one encoder pass)."""
+        raise NotImplementedError
+
+
+class WhisperEngine(TranscriptionEngine):
+    """openai-whisper at the deployment's default device and precision."""
+
+    name = "whisper"
+    supports_batching = True
+
+    def model_key(self, model_size: str) -> ModelKey:
+        return model_registry.resolve(model_size)
+
+    def label(self, model_size: str) -> str:
+        # Reference engine keeps the plain size so existing cache entries stay valid
+        return model_size
+
+    def transcribe(self, audio: np.ndarray, language: Optional[str] = None, model_size: str = "base", **options) -> Dict:
+        key = self.model_key(model_size)
+        model = model_registry.get_by_key(key)
+        options.setdefault("verbose", None)
+        return model.transcribe(audio, language=language, fp16=key.precision == "fp16", **options)
+
+    def detect_language(self, audio: np.ndarray, model_size: str = "base") -> Tuple[str, float]:
+        import torch
+        import whisper
+
+        key = self.model_key(model_size)
+        model = model_registry.get_by_key(key)
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), model.dims.n_mels)
+        mel = mel.to(model.device).to(torch.float16 if key.precision == "fp16" else torch.float32)
+        _, probs = model.detect_language(mel)
+        language = max(probs, key=probs.get)
+        return language, float(probs[language])
+
+
+class QuantizedWhisperEngine(WhisperEngine):
+    """openai-whisper with int8 dynamically quantized Linear layers on CPU."""
+
+    name = "whisper-int8"
+
+    def model_key(self, model_size: str) -> ModelKey:
+        # torch dynamic quantization only has CPU kernels
+        return model_registry.resolve(model_size, device="cpu", precision="int8")
+
+    def label(self, model_size: str) -> str:
+        return TranscriptionEngine.label(self, model_size)
+
+
+def _load_faster_whisper(key: ModelKey):
+    try:
+        from faster_whisper import WhisperModel
+    except ImportError as e:
+        raise RuntimeError(
+            "SYNAPSE_TRANSCRIPTION_ENGINE=faster-whisper requires the faster-whisper package "
+            "(pip install faster-whisper)"
+        ) from e
+    compute_type = key.precision.split("-", 1)[1]
+    return WhisperModel(key.size, device=key.device, compute_type=compute_type, cpu_threads=TORCH_THREADS)
+
+
+class FasterWhisperEngine(TranscriptionEngine):
+    """CTranslate2 Whisper (faster-whisper), int8 on CPU by default."""
+
+    name = "faster-whisper"
+
+    def __init__(self, compute_type: str = CT2_COMPUTE_TYPE):
+        self.compute_type = compute_type
+
+    def model_key(self, model_size: str) -> ModelKey:
+        return ModelKey(model_size, "cpu", f"ct2-{self.compute_type}")
+
+    def load(self, model_size: str):
+        return model_registry.get_by_key(self.model_key(model_size), loader=_load_faster_whisper)
+
+    def transcribe(self, audio: np.ndarray, language: Optional[str] = None, model_size: str = "base", **options) -> Dict:
+        model = self.load(model_size)
+        options.pop("verbose", None)
+        temperature = options.pop("temperature", 0.0)
+        if isinstance(temperature, tuple):
+            temperature = list(temperature)
+        segments, info = model.transcribe(audio, language=language, temperature=temperature, **options)
+
+        result_segments = []
+        for segment in segments:
+            entry = {"start": segment.start, "end": segment.end, "text": segment.text}
+            if segment.words is not None:
+                entry["words"] = [{"word": w.word, "start": w.start, "end": w.end} for w in segment.words]
+            result_segments.append(entry)
+        return {
+            "text": "".join(s["text"] for s in result_segments),
+            "language": info.language,
+            "segments": result_segments,
+        }
+
+    def detect_language(self, audio: np.ndarray, model_size: str = "base") -> Tuple[str, float]:
+        # Detection runs eagerly; segments are a lazy generator, so nothing is decoded here
+        _, info = self.load(model_size).transcribe(audio)
+        return info.language, float(info.language_probability)
+
+
+ENGINES = {
+    WhisperEngine.name: WhisperEngine,
+    QuantizedWhisperEngine.name: QuantizedWhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine,
+}
+
+_instances: Dict[str, TranscriptionEngine] = {}
+
+
+def get_engine(name: Optional[str] = None) -> TranscriptionEngine:
+    """Return the named engine (default: SYNAPSE_TRANSCRIPTION_ENGINE)."""
+    name = name or TRANSCRIPTION_ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"Unknown transcription engine '{name}' (choose from {', '.join(ENGINES)})")
+    if name not in _instances:
+        _instances[name] = ENGINES[name]()
+    return _instances[name]
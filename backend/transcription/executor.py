@@ -0,0 +1,139 @@
+"""
+Dedicated, bounded executor for Whisper inference.
+
+Transcription jobs run on their own thread pool, sized to the machine's
+cores, instead of the event loop's default executor. torch's intra-op thread
+count is set (when the first torch-backed model loads) so that concurrent
+jobs together use the cores once rather than oversubscribing them. With
+micro-batching on (SYNAPSE_WHISPER_BATCHING), the workers mostly wait on the
+single batching thread, so there are enough of them to fill a batch and
+torch gets every core. Admission is bounded: when every worker is busy and
+the queue is full, new jobs are rejected with TranscriptionOverloaded (HTTP
+429) instead of piling up and slowing everyone down.
+"""
+
+import os
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict
+
+CPU_COUNT = os.cpu_count() or 1
+# Micro-batching of short clips (transcription/batching.py); off until
+# benchmarks.batching_benchmark shows a gain on the deployment's hardware
+WHISPER_BATCHING = os.getenv("SYNAPSE_WHISPER_BATCHING", "false").lower() in ("1", "true", "yes")
+MAX_BATCH_SIZE = int(os.getenv("SYNAPSE_WHISPER_MAX_BATCH", "8"))
+_PARALLEL_WORKERS = max(1, min(4, CPU_COUNT // 2))
+# Batched: workers block on the batcher, so there must be enough of them to fill a batch
+_DEFAULT_WORKERS = max(_PARALLEL_WORKERS, MAX_BATCH_SIZE) if WHISPER_BATCHING else _PARALLEL_WORKERS
+TRANSCRIPTION_WORKERS = int(os.getenv("SYNAPSE_TRANSCRIPTION_WORKERS", str(_DEFAULT_WORKERS)))
+TRANSCRIPTION_QUEUE_SIZE = int(os.getenv("SYNAPSE_TRANSCRIPTION_QUEUE_SIZE", str(TRANSCRIPTION_WORKERS * 4)))
+# Batched: one thread runs most inference, so it gets every core
+_DEFAULT_TORCH_THREADS = CPU_COUNT if WHISPER_BATCHING else max(1, CPU_COUNT // TRANSCRIPTION_WORKERS)
+TORCH_THREADS = int(os.getenv("SYNAPSE_TORCH_THREADS", str(_DEFAULT_TORCH_THREADS)))
+
+
+class TranscriptionOverloaded(Exception):
+    """Raised when the transcription queue is full."""
+
+
+class TranscriptionCancelled(Exception):
+    """Raised inside a job whose caller went away (its stop event was set)."""
+
+
+_torch_configured = False
+_torch_lock = threading.Lock()
+
+
+def configure_torch_threads():
+    """Set torch's intra-op thread count once; called by loaders of torch-backed models."""
+    global _torch_configured
+    with _torch_lock:
+        if not _torch_configured:
+            import torch
+            torch.set_num_threads(TORCH_THREADS)
+            _torch_configured = True
+
+
+class TranscriptionExecutor:
+    """Thread pool with bounded admission and queue-depth metrics."""
+
+    def __init__(self, workers: int = TRANSCRIPTION_WORKERS, max_queue: int = TRANSCRIPTION_QUEUE_SIZE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcribe")
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.peak_queue_depth = 0
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        with self._lock:
+            if self._admitted >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise TranscriptionOverloaded(
+                    f"Transcription queue full ({self.max_queue} waiting, {self.workers} running)"
+                )
+            self._admitted += 1
+            self.peak_queue_depth = max(self.peak_queue_depth, self._admitted - self._running)
+
+        def job():
+            with self._lock:
+                self._running += 1
+            succeeded = False
+            try:
+                result = fn(*args, **kwargs)
+                succeeded = True
+                return result
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._admitted -= 1
+                    if succeeded:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+
+        future = self._pool.submit(job)
+
+        def release_if_cancelled(f: Future):
+            # A job cancelled while queued never ran, so release its slot here
+            if f.cancelled():
+                with self._lock:
+                    self._admitted -= 1
+
+        future.add_done_callback(release_if_cancelled)
+        return future
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Submit from the event loop and await the result."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    @property
+    def queue_depth(self) -> int:
+        return self._admitted - self._running
+
+    @property
+    def in_flight(self) -> int:
+        """Jobs admitted and not finished, running or queued."""
+        return self._admitted
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "torch_threads": TORCH_THREADS,
+                "running": self._running,
+                "queue_depth": self._admitted - self._running,
+                "max_queue": self.max_queue,
+                "peak_queue_depth": self.peak_queue_depth,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+
+transcription_executor = TranscriptionExecutor()
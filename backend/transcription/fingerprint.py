@@ -0,0 +1,173 @@
+"""
+Acoustic fingerprints of decoded audio, for cache hits across re-encodings.
+
+The transcription cache is keyed by a hash of the uploaded bytes, so the
+same recording sent as WebM from one app and as MP3 from another always
+misses. A fingerprint is computed from the decoded 16 kHz PCM instead:
+leading/trailing silence is trimmed and the level normalized, then each
+32 ms frame gets 32 bits - the sign of the energy difference between
+adjacent frequency bands, compared with the previous frame (Haitsma-Kalker
+style). Those signs survive lossy codecs, resampling and gain changes.
+
+The index maps fingerprints to the content hash whose transcripts are
+cached. Two clips match when their lengths agree and few enough bits
+differ (SYNAPSE_FINGERPRINT_MAX_BER), allowing a frame or two of shift for
+encoder delay. It lives in process memory; the transcripts it points to
+are in the regular (memory and disk) caches.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from transcription.decoding import SAMPLE_RATE
+
+FINGERPRINT_ENABLED = os.getenv("SYNAPSE_AUDIO_FINGERPRINT", "true").lower() not in ("0", "false", "no")
+# Share of differing bits below which two clips are the same recording
+FINGERPRINT_MAX_BER = float(os.getenv("SYNAPSE_FINGERPRINT_MAX_BER", "0.15"))
+FINGERPRINT_MAX_ENTRIES = int(os.getenv("SYNAPSE_FINGERPRINT_MAX_ENTRIES", "10000"))
+
+WINDOW = 2048
+HOP = 512
+BANDS = 33
+MIN_HZ, MAX_HZ = 300.0, 3000.0
+# Shorter clips have too few bits to tell recordings apart
+MIN_FRAMES = 32
+# Samples below this share of the peak count as silence when trimming
+TRIM_LEVEL = 0.05
+# Frame shifts tried when comparing, for codec delay and padding
+MAX_SHIFT = 2
+# Relative length difference tolerated between matching clips
+LENGTH_TOLERANCE = 0.02
+
+_edges = np.geomspace(MIN_HZ, MAX_HZ, BANDS + 1)
+_bins = np.fft.rfftfreq(WINDOW, 1.0 / SAMPLE_RATE)
+# Band index of each FFT bin, -1 outside MIN_HZ..MAX_HZ
+_band_of_bin = np.searchsorted(_edges, _bins, side="right") - 1
+_band_of_bin[(_bins < MIN_HZ) | (_bins >= MAX_HZ)] = -1
+_window = np.hanning(WINDOW).astype(np.float32)
+
+
+def audio_fingerprint(audio: np.ndarray) -> Optional[np.ndarray]:
+    """
+    One uint32 per frame of 16 kHz float32 audio, or None when the clip is
+    silent or too short to fingerprint reliably.
+    """
+    if len(audio) == 0:
+        return None
+    peak = float(np.max(np.abs(audio)))
+    if peak <= 1e-4:
+        return None
+    loud = np.flatnonzero(np.abs(audio) >= TRIM_LEVEL * peak)
+    audio = audio[loud[0]:loud[-1] + 1] / peak
+
+    frames = 1 + (len(audio) - WINDOW) // HOP
+    if frames < MIN_FRAMES + 1:
+        return None
+    strides = (audio.strides[0] * HOP, audio.strides[0])
+    framed = np.lib.stride_tricks.as_strided(audio, shape=(frames, WINDOW), strides=strides)
+    power = np.abs(np.fft.rfft(framed * _window, axis=1)) ** 2
+
+    in_band = _band_of_bin >= 0
+    energies = np.zeros((frames, BANDS), dtype=np.float64)
+    np.add.at(energies.T, _band_of_bin[in_band], power[:, in_band].T)
+
+    band_diff = energies[:, :-1] - energies[:, 1:]
+    bits = (band_diff[1:] - band_diff[:-1]) > 0
+    return np.packbits(bits, axis=1, bitorder="little").view(np.uint32).ravel()
+
+
+def bit_error_rate(a: np.ndarray, b: np.ndarray) -> float:
+    """Lowest share of differing bits over shifts of up to MAX_SHIFT frames."""
+    best = 1.0
+    for shift in range(-MAX_SHIFT, MAX_SHIFT + 1):
+        x, y = (a[shift:], b) if shift >= 0 else (a, b[-shift:])
+        n = min(len(x), len(y))
+        if n < MIN_FRAMES:
+            continue
+        differing = np.unpackbits(np.bitwise_xor(x[:n], y[:n]).view(np.uint8)).sum()
+        best = min(best, differing / (n * 32))
+    return best
+
+
+class FingerprintEntry(NamedTuple):
+    fingerprint: np.ndarray
+    audio_hash: str
+
+
+class FingerprintIndex:
+    """Thread-safe LRU of fingerprint -> content hash, bucketed by frame count."""
+
+    def __init__(self, max_entries: int = FINGERPRINT_MAX_ENTRIES, max_ber: float = FINGERPRINT_MAX_BER):
+        self.max_entries = max_entries
+        self.max_ber = max_ber
+        self._entries: "OrderedDict[str, FingerprintEntry]" = OrderedDict()
+        self._by_length: Dict[int, List[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def match(self, fingerprint: np.ndarray) -> Optional[str]:
+        """Content hash of the closest indexed recording within max_ber, if any."""
+        length = len(fingerprint)
+        tolerance = max(MAX_SHIFT, int(length * LENGTH_TOLERANCE))
+        with self._lock:
+            candidates = [
+                self._entries[audio_hash]
+                for n in range(length - tolerance, length + tolerance + 1)
+                for audio_hash in self._by_length.get(n, ())
+            ]
+        best, best_ber = None, self.max_ber
+        for entry in candidates:
+            ber = bit_error_rate(fingerprint, entry.fingerprint)
+            if ber <= best_ber:
+                best, best_ber = entry.audio_hash, ber
+        with self._lock:
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if best in self._entries:
+                self._entries.move_to_end(best)
+        print(f"[FINGERPRINT] Matched re-encoded audio (bit error rate {best_ber:.3f})")
+        return best
+
+    def add(self, fingerprint: np.ndarray, audio_hash: str):
+        with self._lock:
+            if audio_hash in self._entries:
+                self._entries.move_to_end(audio_hash)
+                return
+            self._entries[audio_hash] = FingerprintEntry(fingerprint, audio_hash)
+            self._by_length.setdefault(len(fingerprint), []).append(audio_hash)
+            while len(self._entries) > self.max_entries:
+                _, oldest = self._entries.popitem(last=False)
+                self._unlink(oldest)
+
+    def _unlink(self, entry: FingerprintEntry):
+        bucket = self._by_length[len(entry.fingerprint)]
+        bucket.remove(entry.audio_hash)
+        if not bucket:
+            del self._by_length[len(entry.fingerprint)]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_length.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": FINGERPRINT_ENABLED,
+                "fingerprints": len(self._entries),
+                "max_ber": self.max_ber,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+fingerprint_index = FingerprintIndex()
@@ -0,0 +1,125 @@
+"""
+Language detection reuse for streaming sessions.
+
+Without a language, Whisper runs a detection pass (one encoder pass over
+the first 30 s) on every call - on a live session that is every step, for
+the same speaker. A SessionLanguage detects once per step until a detection
+is confident (SYNAPSE_LANGUAGE_MIN_PROBABILITY), then reuses that language
+for the rest of the session. Until then each step passes its own detection
+to the transcription, so the detection never runs twice for one step.
+
+Confident detections are also remembered per client id (LRU with TTL), so
+a client's next session starts with its language already known.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+from transcription.decoding import SAMPLE_RATE
+
+LANGUAGE_MIN_PROBABILITY = float(os.getenv("SYNAPSE_LANGUAGE_MIN_PROBABILITY", "0.8"))
+# Detection on less speech than this is never trusted for the whole session
+LANGUAGE_MIN_SECONDS = float(os.getenv("SYNAPSE_LANGUAGE_MIN_SECONDS", "3"))
+CLIENT_LANGUAGE_TTL = float(os.getenv("SYNAPSE_CLIENT_LANGUAGE_TTL", "86400"))
+CLIENT_LANGUAGE_MAX = int(os.getenv("SYNAPSE_CLIENT_LANGUAGE_MAX", "10000"))
+
+
+class DetectedLanguage(NamedTuple):
+    language: str
+    probability: float
+    expires_at: float
+
+
+class ClientLanguageCache:
+    """Thread-safe LRU of confident per-client detections, with detection counters."""
+
+    def __init__(self, max_clients: int = CLIENT_LANGUAGE_MAX, ttl_seconds: float = CLIENT_LANGUAGE_TTL):
+        self.max_clients = max_clients
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, DetectedLanguage]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.detections = 0
+        self.reused = 0
+
+    def get(self, client_id: str) -> Optional[DetectedLanguage]:
+        with self._lock:
+            entry = self._entries.get(client_id)
+            if entry is None or entry.expires_at <= time.monotonic():
+                if entry is not None:
+                    del self._entries[client_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(client_id)
+            self.hits += 1
+            return entry
+
+    def put(self, client_id: str, language: str, probability: float):
+        with self._lock:
+            self._entries[client_id] = DetectedLanguage(language, probability, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(client_id)
+            while len(self._entries) > self.max_clients:
+                self._entries.popitem(last=False)
+
+    def count(self, detected: bool):
+        with self._lock:
+            if detected:
+                self.detections += 1
+            else:
+                self.reused += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "clients": len(self._entries),
+                "client_hits": self.hits,
+                "client_misses": self.misses,
+                "detections": self.detections,
+                "reused": self.reused,
+                "min_probability": LANGUAGE_MIN_PROBABILITY,
+            }
+
+
+client_languages = ClientLanguageCache()
+
+
+class SessionLanguage:
+    """Detected language of one streaming session. Not thread-safe, like the transcriber."""
+
+    def __init__(self, client_id: Optional[str] = None, cache: ClientLanguageCache = client_languages):
+        self.client_id = client_id
+        self.cache = cache
+        self.language: Optional[str] = None
+        self.probability = 0.0
+        self.locked = False
+
+    def resolve(self, audio: np.ndarray, engine, model_size: str) -> Optional[str]:
+        """
+        Language to transcribe `audio` with: the session's once it is
+        confident (no detection pass), otherwise a fresh detection on `audio`.
+        """
+        if not self.locked and self.client_id:
+            known = self.cache.get(self.client_id)
+            if known is not None:
+                self._lock_to(known.language, known.probability)
+        if self.locked:
+            self.cache.count(detected=False)
+            return self.language
+
+        self.language, self.probability = engine.detect_language(audio, model_size)
+        self.cache.count(detected=True)
+        if self.probability >= LANGUAGE_MIN_PROBABILITY and len(audio) >= LANGUAGE_MIN_SECONDS * SAMPLE_RATE:
+            self._lock_to(self.language, self.probability)
+            if self.client_id:
+                self.cache.put(self.client_id, self.language, self.probability)
+        return self.language
+
+    def _lock_to(self, language: str, probability: float):
+        self.language, self.probability, self.locked = language, probability, True
+        print(f"[LANGUAGE] Session language '{language}' (p={probability:.2f}), skipping further detection")
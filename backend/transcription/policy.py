@@ -0,0 +1,166 @@
+"""
+Adaptive model and decoding selection for model_size="auto".
+
+Each request is matched to a decoding profile - model size, beam size,
+temperature fallback and condition_on_previous_text - from most to least
+accurate. The policy predicts the inference time of each profile from the
+clip's speech duration and a per-model real-time factor, and picks the most
+accurate one that fits the request's remaining latency budget.
+
+Load is part of the budget: with jobs waiting in the transcription queue,
+this job only gets its share of the remaining time, so under a burst the
+policy degrades to smaller models (down to tiny) instead of letting the
+queue blow everyone's latency target. Real-time factors start from
+conservative CPU estimates and are updated from observed inference times.
+"""
+
+import os
+import time
+import threading
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from transcription.executor import transcription_executor
+
+AUTO_MODEL_SIZE = "auto"
+# Latency target for requests that don't set one
+DEFAULT_LATENCY_TARGET_MS = float(os.getenv("SYNAPSE_LATENCY_TARGET_MS", "5000"))
+
+# Inference seconds per second of speech on CPU (greedy decoding), before observations
+DEFAULT_RTF = {"tiny": 0.05, "base": 0.1, "small": 0.3, "medium": 0.8, "large": 1.6, "turbo": 0.6}
+# Relative cost of beam search over greedy decoding
+BEAM_COST = {1: 1.0, 2: 1.3, 5: 1.8}
+# Expected share of segments re-decoded per extra fallback temperature
+FALLBACK_COST = 0.05
+# Weight of each new observation in the running real-time factor
+RTF_SMOOTHING = 0.2
+
+FULL_FALLBACK = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+
+@dataclass(frozen=True)
+class DecodingProfile:
+    name: str
+    model_size: str
+    # None uses the engine's default decoder (greedy for whisper)
+    beam_size: Optional[int]
+    temperature: Tuple[float, ...]
+    condition_on_previous_text: bool
+
+    def options(self) -> Dict:
+        """Keyword options for TranscriptionEngine.transcribe."""
+        options = {
+            "temperature": self.temperature,
+            "condition_on_previous_text": self.condition_on_previous_text,
+        }
+        if self.beam_size is not None:
+            options["beam_size"] = self.beam_size
+        return options
+
+    def cost(self) -> float:
+        """Decoding cost relative to greedy decoding without fallback."""
+        beam = BEAM_COST.get(self.beam_size or 1, 1.0 + 0.2 * (self.beam_size or 1))
+        return beam * (1.0 + FALLBACK_COST * (len(self.temperature) - 1))
+
+
+# Most accurate first
+PROFILES: List[DecodingProfile] = [
+    DecodingProfile("accurate", "small", 5, FULL_FALLBACK, True),
+    DecodingProfile("balanced", "base", None, FULL_FALLBACK, True),
+    DecodingProfile("fast", "base", None, (0.0, 0.4, 0.8), False),
+    DecodingProfile("degraded", "tiny", None, (0.0,), False),
+]
+
+
+def model_sizes() -> List[str]:
+    """Model sizes the policy can pick, most accurate first."""
+    sizes = []
+    for profile in PROFILES:
+        if profile.model_size not in sizes:
+            sizes.append(profile.model_size)
+    return sizes
+
+
+def latency_deadline(latency_target_ms: Optional[float] = None) -> float:
+    """Monotonic deadline for a request arriving now."""
+    target = latency_target_ms if latency_target_ms is not None else DEFAULT_LATENCY_TARGET_MS
+    return time.monotonic() + target / 1000.0
+
+
+class TranscriptionPolicy:
+    """Picks a DecodingProfile per request and learns real-time factors."""
+
+    def __init__(self, profiles: List[DecodingProfile] = PROFILES):
+        self.profiles = profiles
+        self._rtf: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.chosen: Dict[str, int] = {p.name: 0 for p in profiles}
+        self.missed_budget = 0
+
+    def rtf(self, label: str) -> float:
+        """Real-time factor for an engine model label (TranscriptionEngine.label)."""
+        with self._lock:
+            return self._rtf.get(label, DEFAULT_RTF.get(label.split("/")[0].split(".")[0], 1.0))
+
+    def predict_ms(self, profile: DecodingProfile, audio_seconds: float, parallelism: int = 1,
+                   label: Callable[[str], str] = str) -> float:
+        rtf = self.rtf(label(profile.model_size))
+        return 1000.0 * audio_seconds * rtf * profile.cost() / max(1, parallelism)
+
+    def choose(
+        self,
+        audio_seconds: float,
+        deadline: Optional[float] = None,
+        parallelism: int = 1,
+        label: Callable[[str], str] = str,
+    ) -> Tuple[DecodingProfile, float]:
+        """
+        Most accurate profile predicted to finish within this job's share of
+        the remaining budget; the last (fastest) profile if none does.
+        `label` maps a model size to the engine's label (real-time factors
+        are tracked per engine and size).
+
+        Returns:
+            (profile, predicted inference ms)
+        """
+        if deadline is None:
+            deadline = latency_deadline()
+        remaining_ms = max(0.0, (deadline - time.monotonic()) * 1000.0)
+        # Jobs queued behind this one need the workers too
+        waiting = transcription_executor.queue_depth
+        budget_ms = remaining_ms / (1.0 + waiting / max(1, transcription_executor.workers))
+
+        missed = False
+        for profile in self.profiles:
+            predicted = self.predict_ms(profile, audio_seconds, parallelism, label)
+            if predicted <= budget_ms:
+                break
+        else:
+            missed = True
+        with self._lock:
+            self.chosen[profile.name] += 1
+            self.missed_budget += missed
+        return profile, predicted
+
+    def observe(self, label: str, audio_seconds: float, elapsed_seconds: float, profile: Optional[DecodingProfile] = None):
+        """Update a model's real-time factor from one measured (unbatched) inference."""
+        if audio_seconds < 1.0:
+            # Fixed per-call overhead dominates very short clips
+            return
+        observed = elapsed_seconds / audio_seconds / (profile.cost() if profile is not None else 1.0)
+        current = self.rtf(label)
+        with self._lock:
+            self._rtf[label] = (1 - RTF_SMOOTHING) * current + RTF_SMOOTHING * observed
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "latency_target_ms": DEFAULT_LATENCY_TARGET_MS,
+                "profiles": [asdict(p) for p in self.profiles],
+                "observed_rtf": {label: round(value, 3) for label, value in self._rtf.items()},
+                "chosen": dict(self.chosen),
+                "missed_budget": self.missed_budget,
+            }
+
+
+transcription_policy = TranscriptionPolicy()
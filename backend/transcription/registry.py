@@ -0,0 +1,159 @@
+"""
+Whisper model registry keyed by (size, device, precision).
+
+Precision is 'fp32', 'fp16', 'int8' (dynamically quantized Linear layers,
+CPU only) or an engine-specific tag such as 'ct2-int8' for models loaded
+through a custom loader (see transcription.engines).
+
+Several model sizes can be resident at once within a memory budget; the
+least recently used model is evicted when loading another would exceed it.
+Loads are serialized per key, so concurrent first requests for the same model
+load it only once while requests for other models proceed.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+from transcription.executor import configure_torch_threads
+
+WHISPER_MEMORY_BUDGET_MB = float(os.getenv("SYNAPSE_WHISPER_MEMORY_MB", "2048"))
+WHISPER_DEVICE = os.getenv("SYNAPSE_WHISPER_DEVICE", "")
+WHISPER_PRECISION = os.getenv("SYNAPSE_WHISPER_PRECISION", "")
+
+
+class ModelKey(NamedTuple):
+    size: str
+    device: str
+    precision: str
+
+    def __str__(self):
+        return f"{self.size}/{self.device}/{self.precision}"
+
+
+def _default_device() -> str:
+    if WHISPER_DEVICE:
+        return WHISPER_DEVICE
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+# Approximate fp32 weight sizes, for models that don't expose torch parameters
+FP32_MODEL_MB = {"tiny": 150, "base": 290, "small": 970, "medium": 3060, "large": 6170, "turbo": 3240}
+
+
+def _model_bytes(model, key: ModelKey) -> int:
+    if not hasattr(model, "parameters"):
+        fp32_mb = FP32_MODEL_MB.get(key.size.split(".")[0].split("-")[0], 1000)
+        return fp32_mb * 1024 * 1024 // (4 if key.precision.endswith("int8") else 2)
+    tensors = list(model.parameters()) + list(model.buffers())
+    for module in model.modules():
+        # Quantized layers keep their packed weights outside parameters()
+        weight = getattr(module, "weight", None)
+        if callable(weight):
+            tensors.append(weight())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def _quantize_int8(model):
+    """Dynamically quantize every Linear layer (attention and MLP) to int8."""
+    import torch
+    from torch import nn
+
+    # whisper subclasses nn.Linear, which torch's quantization mappings don't match
+    for module in list(model.modules()):
+        for name, child in list(module.named_children()):
+            if isinstance(child, nn.Linear) and type(child) is not nn.Linear:
+                plain = nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                plain.weight = child.weight
+                plain.bias = child.bias
+                setattr(module, name, plain)
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def _load_whisper(key: ModelKey):
+    import whisper
+    configure_torch_threads()
+    model = whisper.load_model(key.size, device=key.device)
+    if key.precision == "fp16":
+        model = model.half()
+    elif key.precision == "int8":
+        model = _quantize_int8(model.eval())
+    return model
+
+
+class ModelRegistry:
+    """LRU of loaded models bounded by total parameter memory."""
+
+    def __init__(self, memory_budget_mb: float = WHISPER_MEMORY_BUDGET_MB, loader=_load_whisper):
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self._loader = loader
+        self._models: "OrderedDict[ModelKey, tuple]" = OrderedDict()
+        self._load_locks: Dict[ModelKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def resolve(self, model_size: str, device: Optional[str] = None, precision: Optional[str] = None) -> ModelKey:
+        """Fill in the deployment's default device and precision."""
+        device = device or _default_device()
+        precision = precision or WHISPER_PRECISION or ("fp16" if device.startswith("cuda") else "fp32")
+        return ModelKey(model_size, device, precision)
+
+    def get(self, model_size: str, device: Optional[str] = None, precision: Optional[str] = None):
+        return self.get_by_key(self.resolve(model_size, device, precision))
+
+    def get_by_key(self, key: ModelKey, loader=None):
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key][0]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another request may have finished loading while we waited
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    return self._models[key][0]
+
+            print(f"[MODELS] Loading Whisper {key} (first load may take a moment)...")
+            model = (loader or self._loader)(key)
+            size = _model_bytes(model, key)
+
+            with self._lock:
+                self._models[key] = (model, size)
+                self.loads += 1
+                self._evict_over_budget(keep=key)
+            print(f"[MODELS] Loaded Whisper {key} ({size / 1024 / 1024:.0f} MB)")
+            return model
+
+    def _evict_over_budget(self, keep: ModelKey):
+        while self._used() > self.memory_budget and len(self._models) > 1:
+            oldest = next(iter(self._models))
+            if oldest == keep:
+                break
+            del self._models[oldest]
+            self.evictions += 1
+            print(f"[MODELS] Evicted Whisper {oldest} to stay within memory budget")
+
+    def _used(self) -> int:
+        return sum(size for _, size in self._models.values())
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "loaded_models": [str(key) for key in self._models],
+                "memory_used_mb": round(self._used() / 1024 / 1024, 1),
+                "memory_budget_mb": round(self.memory_budget / 1024 / 1024, 1),
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
+
+
+model_registry = ModelRegistry()
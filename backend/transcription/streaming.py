@@ -0,0 +1,235 @@
+"""
+Incremental streaming transcription over a sliding window.
+
+Audio is decoded once as it arrives. Each step transcribes only the audio
+after the last committed word (plus a short overlap for context), so the
+cost of a step is bounded by the window size rather than the utterance
+length. Words are committed once two consecutive hypotheses agree on them
+(local agreement); the rest is reported as a tentative tail that may still
+change. Audio before the window is dropped, so memory stays bounded however
+long the session runs, and the audio received between steps is capped - in
+decoded seconds (SYNAPSE_STREAM_MAX_PENDING_SECONDS), since a few MB of
+Opus/WebM can decode to hundreds of MB of float32.
+Without a fixed language, detection runs until it is confident and is then
+reused for the session (transcription/language.py).
+"""
+
+import os
+import re
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from transcription.buffers import AudioTooLarge, WS_MAX_AUDIO_BYTES
+from transcription.decoding import StreamingDecoder, SAMPLE_RATE
+from transcription.engines import get_engine
+from transcription.language import SessionLanguage
+from transcription.vad import VAD_ENABLED, UtteranceDetector, has_speech
+
+STREAM_WINDOW_SECONDS = float(os.getenv("SYNAPSE_STREAM_WINDOW_SECONDS", "20"))
+STREAM_OVERLAP_SECONDS = float(os.getenv("SYNAPSE_STREAM_OVERLAP_SECONDS", "1.0"))
+# Decoded audio a session may accumulate before the next step (~19 MB of float32 at 300 s)
+STREAM_MAX_PENDING_SECONDS = float(os.getenv("SYNAPSE_STREAM_MAX_PENDING_SECONDS", "300"))
+# Audio kept uncommitted when the window overflows and words are force-committed
+STREAM_TAIL_SECONDS = 2.0
+PROMPT_CHARS = 200
+
+
+class Word(NamedTuple):
+    text: str
+    start: float
+    end: float
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def _join(words: List[Word]) -> str:
+    return "".join(w.text for w in words).strip()
+
+
+class StreamingTranscriber:
+    """Per-connection streaming transcription state. Not thread-safe: run one step at a time."""
+
+    def __init__(
+        self,
+        model_size: str = "base",
+        language: Optional[str] = None,
+        audio_format: Optional[str] = None,
+        sample_rate: int = SAMPLE_RATE,
+        window_seconds: float = STREAM_WINDOW_SECONDS,
+        overlap_seconds: float = STREAM_OVERLAP_SECONDS,
+        max_pending_bytes: int = WS_MAX_AUDIO_BYTES,
+        client_id: Optional[str] = None,
+        max_pending_seconds: float = STREAM_MAX_PENDING_SECONDS,
+    ):
+        self.model_size = model_size
+        self.language = language
+        self.window_seconds = window_seconds
+        self.overlap_seconds = overlap_seconds
+        self.decoder = StreamingDecoder(audio_format, sample_rate)
+        self.max_pending_bytes = max_pending_bytes
+        self._pending_bytes = 0
+        self._pending: List[np.ndarray] = []
+        self._pending_samples = 0
+        self.max_pending_samples = int(max_pending_seconds * SAMPLE_RATE)
+        self._utterance_ended = False
+        self._audio = np.zeros(0, dtype=np.float32)
+        # Samples dropped from the front of _audio (already committed)
+        self._offset = 0
+        self._feed_lock = threading.Lock()
+        self.utterance = UtteranceDetector()
+        self.committed: List[Word] = []
+        self.tentative: List[Word] = []
+        self.commit_time = 0.0
+        self.session_language = SessionLanguage(client_id)
+
+    def feed(self, data: bytes):
+        with self._feed_lock:
+            if self._pending_bytes + len(data) > self.max_pending_bytes:
+                raise AudioTooLarge(
+                    f"More than {self.max_pending_bytes / (1024 * 1024):g} MB of audio since the last transcription"
+                )
+            self.decoder.feed(data)
+            self._pending_bytes += len(data)
+        # Decode eagerly so the cap applies to decoded audio, not to what ffmpeg buffered
+        self._drain()
+
+    @property
+    def detected_language(self) -> Optional[str]:
+        return self.session_language.language
+
+    @property
+    def duration(self) -> float:
+        return (self._offset + len(self._audio)) / SAMPLE_RATE
+
+    def _drain(self, final: bool = False):
+        """Move decoded samples to the pending list, noting the end of an utterance."""
+        with self._feed_lock:
+            new_audio = self.decoder.close() if final else self.decoder.read()
+            if not len(new_audio):
+                return
+            if not final and self._pending_samples + len(new_audio) > self.max_pending_samples:
+                raise AudioTooLarge(
+                    f"More than {self.max_pending_samples / SAMPLE_RATE:g}s of audio since the last transcription"
+                )
+            self._pending.append(new_audio)
+            self._pending_samples += len(new_audio)
+            if self.utterance.push(new_audio):
+                self._utterance_ended = True
+
+    def poll_utterance_end(self) -> bool:
+        """Cheap check (no inference) for end of utterance after new audio."""
+        if not VAD_ENABLED:
+            return False
+        self._drain()
+        with self._feed_lock:
+            ended, self._utterance_ended = self._utterance_ended, False
+        return ended
+
+    def pending_seconds(self) -> float:
+        """Decoded audio not yet transcribed by a step (no inference)."""
+        self._drain()
+        return self._pending_samples / SAMPLE_RATE
+
+    def _collect(self, final: bool = False):
+        self._drain(final)
+        with self._feed_lock:
+            pending, self._pending = self._pending, []
+            self._pending_bytes = 0
+            self._pending_samples = 0
+        if pending:
+            self._audio = np.concatenate([self._audio, *pending])
+
+    def _trim(self):
+        """Drop audio before the next window; copy only once half the buffer is stale."""
+        stale = int(max(0.0, self.commit_time - self.overlap_seconds) * SAMPLE_RATE) - self._offset
+        if stale > len(self._audio) // 2:
+            self._audio = self._audio[stale:].copy()
+            self._offset += stale
+
+    def _transcribe_window(self) -> List[Word]:
+        window_start = max(0.0, self.commit_time - self.overlap_seconds)
+        window = self._audio[max(0, int(window_start * SAMPLE_RATE) - self._offset):]
+        if len(window) < SAMPLE_RATE // 10:
+            return []
+        if VAD_ENABLED and not has_speech(window):
+            return []
+
+        engine = get_engine()
+        result = engine.transcribe(
+            window,
+            language=self.language or self.session_language.resolve(window, engine, self.model_size),
+            model_size=self.model_size,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+            initial_prompt=_join(self.committed)[-PROMPT_CHARS:] or None,
+        )
+
+        words = []
+        for segment in result.get("segments", []):
+            for w in segment.get("words", []):
+                start, end = window_start + w["start"], window_start + w["end"]
+                # Words inside the overlap were committed by an earlier step
+                if end <= self.commit_time + 0.05:
+                    continue
+                words.append(Word(w["word"], start, end))
+        return words
+
+    def _commit(self, words: List[Word]):
+        if words:
+            self.committed.extend(words)
+            self.commit_time = words[-1].end
+
+    def step(self) -> Dict:
+        """Transcribe newly arrived audio and return the partial hypothesis."""
+        self._collect()
+        hypothesis = self._transcribe_window()
+
+        # Local agreement: commit the prefix shared with the previous hypothesis
+        agreed = 0
+        for previous, current in zip(self.tentative, hypothesis):
+            if _normalize(previous.text) != _normalize(current.text):
+                break
+            agreed += 1
+        self._commit(hypothesis[:agreed])
+        remaining = hypothesis[agreed:]
+
+        # Keep the window bounded: force-commit words older than the tail
+        if self.duration - self.commit_time > self.window_seconds:
+            cutoff = self.duration - STREAM_TAIL_SECONDS
+            forced = [w for w in remaining if w.end <= cutoff]
+            self._commit(forced)
+            remaining = remaining[len(forced):]
+            if not forced:
+                # Nothing recognizable (e.g. silence): skip ahead
+                self.commit_time = max(self.commit_time, cutoff)
+
+        self.tentative = remaining
+        self._trim()
+        return self._result(final=False)
+
+    def finalize(self) -> Dict:
+        """Decode the remaining audio, transcribe the tail and commit everything."""
+        self._collect(final=True)
+        self._commit(self._transcribe_window())
+        self.tentative = []
+        return self._result(final=True)
+
+    def close(self):
+        """Release the decoder (ffmpeg process and reader thread) of an abandoned stream."""
+        self.decoder.terminate()
+
+    def _result(self, final: bool) -> Dict:
+        committed = _join(self.committed)
+        tentative = _join(self.tentative)
+        return {
+            "text": " ".join(part for part in (committed, tentative) if part),
+            "committed": committed,
+            "tentative": tentative,
+            "language": self.language or self.detected_language,
+            "audio_seconds": round(self.duration, 2),
+            "final": final,
+        }
@@ -0,0 +1,175 @@
+"""
+Energy-based voice activity detection on 16 kHz float32 audio.
+
+Cheap enough to run on every clip before inference: frame RMS energy is
+compared against a threshold derived from the clip's own noise floor (or an
+absolute floor when the clip has no quiet frames to measure it from). Used
+to skip clips with no speech (which also makes Whisper hallucinate), trim
+leading/trailing silence, shorten long pauses, split long audio on pauses,
+and detect end of utterance on live streams.
+"""
+
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from transcription.decoding import SAMPLE_RATE
+
+VAD_ENABLED = os.getenv("SYNAPSE_VAD_ENABLED", "true").lower() not in ("0", "false", "no")
+# Silence at the end of a live stream that counts as end of utterance
+END_OF_UTTERANCE_MS = int(os.getenv("SYNAPSE_VAD_END_OF_UTTERANCE_MS", "700"))
+
+FRAME_MS = 30
+FRAME = SAMPLE_RATE * FRAME_MS // 1000
+# Frames must be this far above the noise floor, and never below the absolute floor
+MARGIN_DB = 12.0
+ABSOLUTE_FLOOR_DB = -50.0
+# Below this spread between loud and quiet frames the clip has no silence to
+# measure a noise floor from (e.g. a short clip that is all speech)
+MIN_DYNAMIC_RANGE_DB = MARGIN_DB
+MIN_SPEECH_MS = 150
+MIN_SILENCE_MS = 300
+PAD_MS = 150
+
+Segment = Tuple[int, int]
+
+
+def frame_energies(audio: np.ndarray) -> np.ndarray:
+    """RMS energy in dBFS per 30 ms frame."""
+    frames = len(audio) // FRAME
+    if frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    squared = np.square(audio[: frames * FRAME], dtype=np.float32).reshape(frames, FRAME)
+    return 10.0 * np.log10(squared.mean(axis=1) + 1e-10)
+
+
+def _threshold(energies: np.ndarray) -> float:
+    noise_floor, loud = np.percentile(energies, [10, 90])
+    if loud - noise_floor < MIN_DYNAMIC_RANGE_DB:
+        return ABSOLUTE_FLOOR_DB
+    return max(ABSOLUTE_FLOOR_DB, float(noise_floor) + MARGIN_DB)
+
+
+def detect_speech(audio: np.ndarray, min_silence_ms: int = MIN_SILENCE_MS, pad_ms: int = PAD_MS) -> List[Segment]:
+    """
+    Speech regions as (start, end) sample ranges.
+
+    Gaps shorter than `min_silence_ms` are bridged, bursts shorter than
+    MIN_SPEECH_MS are dropped, and each region is padded by `pad_ms`.
+    """
+    energies = frame_energies(audio)
+    if len(energies) == 0:
+        return []
+    voiced = energies > _threshold(energies)
+
+    # Run boundaries of voiced frames
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+    regions: List[List[int]] = []
+    min_gap = min_silence_ms // FRAME_MS
+    for start, end in zip(starts, ends):
+        if regions and start - regions[-1][1] < min_gap:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+
+    min_frames = MIN_SPEECH_MS // FRAME_MS
+    pad = pad_ms * SAMPLE_RATE // 1000
+    return [
+        (max(0, start * FRAME - pad), min(len(audio), end * FRAME + pad))
+        for start, end in regions
+        if end - start >= min_frames
+    ]
+
+
+def has_speech(audio: np.ndarray) -> bool:
+    return bool(detect_speech(audio))
+
+
+def compact_silence(audio: np.ndarray, segments: List[Segment], max_gap_ms: int = 500) -> np.ndarray:
+    """
+    Drop leading/trailing silence and shorten pauses between speech regions
+    to at most `max_gap_ms`, so less audio goes through the model.
+    """
+    if not segments:
+        return audio[:0]
+    max_gap = max_gap_ms * SAMPLE_RATE // 1000
+    pieces = [audio[segments[0][0]:segments[0][1]]]
+    for (_, previous_end), (start, end) in zip(segments, segments[1:]):
+        gap = start - previous_end
+        if gap > max_gap:
+            # Keep a short slice of the pause so words don't run together
+            pieces.append(audio[previous_end:previous_end + max_gap])
+        else:
+            pieces.append(audio[previous_end:start])
+        pieces.append(audio[start:end])
+    return np.concatenate(pieces)
+
+
+def split_on_pauses(
+    audio: np.ndarray, max_chunk_seconds: float = 30.0, speech: Optional[List[Segment]] = None
+) -> List[Segment]:
+    """
+    Split audio into chunks of at most `max_chunk_seconds`, cutting at pauses
+    between speech regions (or hard-cutting a region that is longer than a
+    chunk by itself). Silence-only stretches are skipped. Pass `speech` to
+    reuse regions already returned by detect_speech.
+    """
+    max_chunk = int(max_chunk_seconds * SAMPLE_RATE)
+    chunks: List[Segment] = []
+    current_start = current_end = None
+    for start, end in (speech if speech is not None else detect_speech(audio)):
+        if current_start is not None and end - current_start > max_chunk:
+            chunks.append((current_start, current_end))
+            current_start = None
+        if current_start is None:
+            current_start = start
+        current_end = end
+        while current_end - current_start > max_chunk:
+            chunks.append((current_start, current_start + max_chunk))
+            current_start += max_chunk
+    if current_start is not None:
+        chunks.append((current_start, current_end))
+    return chunks
+
+
+class UtteranceDetector:
+    """
+    Incremental end-of-utterance detection for live streams.
+
+    Tracks a running noise floor so it can be fed one chunk at a time; reports
+    end of utterance once after speech is followed by END_OF_UTTERANCE_MS of
+    silence.
+    """
+
+    def __init__(self, silence_ms: int = END_OF_UTTERANCE_MS):
+        self.silence_frames_needed = max(1, silence_ms // FRAME_MS)
+        self.noise_floor = None
+        self.speech_seen = False
+        self.silent_frames = 0
+        self._remainder = np.zeros(0, dtype=np.float32)
+
+    def push(self, audio: np.ndarray) -> bool:
+        """Feed new samples; True when an utterance has just ended."""
+        audio = np.concatenate([self._remainder, audio]) if len(self._remainder) else audio
+        usable = len(audio) - len(audio) % FRAME
+        self._remainder = audio[usable:]
+        ended = False
+        for energy in frame_energies(audio[:usable]):
+            if self.noise_floor is None or energy < self.noise_floor:
+                self.noise_floor = float(energy)
+            else:
+                # Let the floor drift up slowly so it follows rising background noise
+                self.noise_floor += 0.05
+            if energy > max(ABSOLUTE_FLOOR_DB, self.noise_floor + MARGIN_DB):
+                self.speech_seen = True
+                self.silent_frames = 0
+            elif self.speech_seen:
+                self.silent_frames += 1
+                if self.silent_frames >= self.silence_frames_needed:
+                    ended = True
+                    self.speech_seen = False
+                    self.silent_frames = 0
+        return ended